@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date
+from app.db.database import get_async_db
+from app.schemas.schemas import RevenueComparison, PeriodComparison
+from app.schemas.schemas import RevenueResponse, RevenueComparisonResponse
+from app.schemas.schemas import RevenueSeriesResponse, PeriodComparisonResponse
+from app.services import revenue_queries
+from app.services.sales_snapshot import get_sales_snapshot
+from app.cache.revenue import cached_revenue, comparison_range_params, date_range_params
+from app.cache.revenue import period_comparison_range_params
+from app.instrumentation import InstrumentedRoute
+
+# Async counterparts of the read-only analytics routes in app/api/sales.py,
+# mounted in their place when DB_ASYNC_MODE is enabled.
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+async def _revenue_rows(db: AsyncSession, query: str, *args):
+    """Async counterpart of app.api.sales._revenue_rows."""
+    snapshot = get_sales_snapshot()
+    if snapshot is not None:
+        return getattr(snapshot, query)(*args)
+    return (await db.execute(getattr(revenue_queries, query)(*args))).all()
+
+
+@router.get("/revenue/daily", response_model=RevenueResponse)
+@cached_revenue("revenue/daily", date_range_params)
+async def get_daily_revenue(
+    start_date: date = Query(..., description="Start date for revenue calculation"),
+    end_date: date = Query(..., description="End date for revenue calculation"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await _revenue_rows(db, "daily_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
+
+
+@router.get("/revenue/weekly", response_model=RevenueResponse)
+@cached_revenue("revenue/weekly", date_range_params)
+async def get_weekly_revenue(
+    start_date: date = Query(..., description="Start date for revenue calculation"),
+    end_date: date = Query(..., description="End date for revenue calculation"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await _revenue_rows(db, "weekly_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
+
+
+@router.get("/revenue/monthly", response_model=RevenueResponse)
+@cached_revenue("revenue/monthly", date_range_params)
+async def get_monthly_revenue(
+    start_date: date = Query(..., description="Start date for revenue calculation"),
+    end_date: date = Query(..., description="End date for revenue calculation"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await _revenue_rows(db, "monthly_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
+
+
+@router.get("/revenue/yearly", response_model=RevenueResponse)
+@cached_revenue("revenue/yearly", date_range_params)
+async def get_yearly_revenue(
+    start_date: date = Query(..., description="Start date for revenue calculation"),
+    end_date: date = Query(..., description="End date for revenue calculation"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rows = await _revenue_rows(db, "yearly_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
+
+
+@router.get("/revenue/series", response_model=RevenueSeriesResponse)
+@cached_revenue("revenue/series", date_range_params)
+async def get_revenue_series(
+    start_date: date = Query(..., description="Start date for revenue calculation"),
+    end_date: date = Query(..., description="End date for revenue calculation"),
+    granularity: str = Query(
+        "day,week,month,year",
+        description="Comma-separated list of day, week, month and/or year",
+    ),
+    breakdown: Optional[str] = Query(
+        None, description="Split every series by category or platform"
+    ),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    platform: Optional[str] = Query(None, description="Filter by platform"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Revenue for several granularities from a single GROUPING SETS query.
+
+    Week, month and year buckets are dated by their first calendar day.
+    """
+    try:
+        granularities = revenue_queries.parse_granularities(granularity)
+        rows = await _revenue_rows(
+            db, "revenue_series", start_date, end_date, granularities, breakdown, category_id, platform
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return revenue_queries.revenue_series_response(
+        rows, granularities, breakdown, category_id, platform
+    )
+
+
+@router.post("/revenue/compare", response_model=RevenueComparisonResponse)
+@cached_revenue("revenue/compare", comparison_range_params)
+async def compare_revenue(
+    comparison: RevenueComparison, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Compare revenue between two periods
+    """
+    periods = revenue_queries.comparison_periods(comparison)
+    row = (await _revenue_rows(db, "period_comparison", periods, None, comparison.category_id))[0]
+    return revenue_queries.comparison_response(comparison, row.revenue_0, row.revenue_1)
+
+
+@router.post("/revenue/compare/periods", response_model=PeriodComparisonResponse)
+@cached_revenue("revenue/compare/periods", period_comparison_range_params)
+async def compare_revenue_periods(
+    comparison: PeriodComparison, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Compare revenue and units across any number of periods, optionally broken
+    down by category, platform or product, with period-over-period deltas
+    """
+    rows = await _revenue_rows(
+        db,
+        "period_comparison",
+        comparison.periods,
+        comparison.breakdown,
+        comparison.category_id,
+        comparison.platform,
+        comparison.product_id,
+    )
+    return revenue_queries.period_comparison_response(comparison, rows)
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
+from typing import List, Optional
+from app.db.database import get_db, get_read_db
 from app.models.models import Category as CategoryModel
 from app.schemas.schemas import Category, CategoryCreate, CategoryUpdate
+from app.cache.products import get_product_cache
+from app.api.etags import not_modified
+from app.api.pagination import decode_cursor, keyset_filter, set_next_cursor
+from app.api.fields import CATEGORY, loader_options, parse_selection, slim_response
+from app.instrumentation import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.post("/", response_model=Category, status_code=status.HTTP_201_CREATED)
 def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
@@ -17,13 +22,36 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[Category])
-def list_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    categories = db.query(CategoryModel).offset(skip).limit(limit).all()
+def list_categories(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name"),
+    db: Session = Depends(get_read_db)
+):
+    selection = parse_selection(CATEGORY, fields, None)
+    unchanged = not_modified(db, request, response, ("categories",))
+    if unchanged is not None:
+        return unchanged
+    query = db.query(CategoryModel).order_by(CategoryModel.id)
+    if selection is not None:
+        query = query.options(*loader_options(selection, ("id",)))
+    if cursor is not None:
+        query = query.filter(keyset_filter([CategoryModel.id], decode_cursor(cursor, int)))
+    else:
+        query = query.offset(skip)
+
+    categories = query.limit(limit).all()
+    set_next_cursor(response, categories, limit, lambda category: (category.id,))
+    if selection is not None:
+        return slim_response(selection, categories, response)
     return categories
 
 
 @router.get("/{category_id}", response_model=Category)
-def retrieve_category(category_id: int, db: Session = Depends(get_db)):
+def retrieve_category(category_id: int, db: Session = Depends(get_read_db)):
     category = db.query(CategoryModel).filter(CategoryModel.id == category_id).first()
     if category is None:
         raise HTTPException(
@@ -47,6 +75,8 @@ def update_category(category_id: int, category: CategoryUpdate, db: Session = De
         setattr(db_category, key, value)
     
     db.commit()
+    # Cached products embed their category
+    get_product_cache().clear()
     db.refresh(db_category)
     return db_category
 
@@ -62,4 +92,5 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_category)
     db.commit()
+    get_product_cache().clear()
     return None 
\ No newline at end of file
@@ -0,0 +1,54 @@
+import hashlib
+from typing import Optional, Sequence
+from fastapi import Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.models import TableVersion
+
+# Conditional GETs for slowly changing reads. The ETag combines the change
+# counters of the tables a response is built from (bumped by a trigger on every
+# write, see TableVersion) with the request path and query, so checking it is a
+# single primary-key lookup and a match skips loading and serializing rows.
+
+ETAG_HEADER = "ETag"
+
+
+def current_etag(db: Session, request: Request, tables: Sequence[str]) -> str:
+    versions = dict(
+        db.execute(
+            select(TableVersion.table_name, TableVersion.version).where(
+                TableVersion.table_name.in_(tables)
+            )
+        ).all()
+    )
+    url = f"{request.url.path}?{request.url.query}".encode()
+    return 'W/"{}-{}"'.format(
+        ".".join(str(versions.get(table, 0)) for table in tables),
+        hashlib.blake2b(url, digest_size=6).hexdigest(),
+    )
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(
+    db: Session, request: Request, response: Response, tables: Sequence[str]
+) -> Optional[Response]:
+    """
+    A 304 response when the client's If-None-Match still matches. Otherwise
+    the ETag is set on `response` and None is returned, so the caller builds
+    the full response.
+    """
+    etag = current_etag(db, request, tables)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
+    response.headers[ETAG_HEADER] = etag
+    return None
@@ -0,0 +1,184 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import joinedload, load_only
+from app.api.etags import ETAG_HEADER
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.models import models
+from app.schemas import schemas
+
+# Sparse fieldsets for list endpoints. `fields=id,sales_date,product.sku` picks
+# columns (dotted paths reach into relations), `expand=product.category` pulls
+# whole related objects. Only the selected columns are loaded, relations are
+# joined only when selected, and rows are serialized through a slim pydantic
+# model derived from the full response schema.
+
+
+@dataclass(eq=False)
+class Resource:
+    model: Any
+    schema: Type[BaseModel]
+    relations: Dict[str, "Resource"] = field(default_factory=dict)
+
+    @property
+    def scalars(self) -> Tuple[str, ...]:
+        return tuple(
+            name for name in self.schema.model_fields if name not in self.relations
+        )
+
+
+CATEGORY = Resource(models.Category, schemas.Category)
+PRODUCT = Resource(models.Product, schemas.Product, {"category": CATEGORY})
+INVENTORY = Resource(models.Inventory, schemas.Inventory, {"product": PRODUCT})
+INVENTORY_HISTORY = Resource(
+    models.InventoryHistory, schemas.InventoryHistory, {"product": PRODUCT}
+)
+SALE = Resource(models.Sale, schemas.Sale, {"product": PRODUCT})
+
+
+@dataclass(frozen=True)
+class Selection:
+    resource: Resource
+    scalars: Tuple[str, ...]
+    children: Tuple[Tuple[str, "Selection"], ...] = ()
+
+
+class _Node:
+    def __init__(self, resource: Resource):
+        self.resource = resource
+        self.scalars: List[str] = []
+        self.everything = False
+        self.children: Dict[str, "_Node"] = {}
+
+    def child(self, name: str, path: str) -> "_Node":
+        if name not in self.resource.relations:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown relation: {path}",
+            )
+        if name not in self.children:
+            self.children[name] = _Node(self.resource.relations[name])
+        return self.children[name]
+
+    def freeze(self) -> Selection:
+        scalars = self.resource.scalars if self.everything else tuple(
+            name for name in self.resource.scalars if name in self.scalars
+        )
+        return Selection(
+            self.resource,
+            scalars,
+            tuple(sorted((name, node.freeze()) for name, node in self.children.items())),
+        )
+
+
+def full_selection(resource: Resource) -> Selection:
+    """Every column and relation, i.e. the shape of the full response schema."""
+    return Selection(
+        resource,
+        resource.scalars,
+        tuple(sorted((name, full_selection(child)) for name, child in resource.relations.items())),
+    )
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def parse_selection(
+    resource: Resource, fields: Optional[str], expand: Optional[str]
+) -> Optional[Selection]:
+    """
+    Build the selection for `fields`/`expand`, or None when neither is given
+    (callers then keep their full response).
+    """
+    field_paths, expand_paths = _split(fields), _split(expand)
+    if not field_paths and not expand_paths:
+        return None
+
+    root = _Node(resource)
+    # Without `fields` every column of the root is returned
+    root.everything = not field_paths
+
+    for path in expand_paths:
+        node = root
+        for name in path.split("."):
+            node = node.child(name, path)
+            node.everything = True
+
+    for path in field_paths:
+        *relations, name = path.split(".")
+        node = root
+        for relation in relations:
+            node = node.child(relation, path)
+        if name in node.resource.relations:
+            node.child(name, path).everything = True
+        elif name in node.resource.scalars:
+            node.scalars.append(name)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field: {path}",
+            )
+
+    return root.freeze()
+
+
+def _columns(selection: Selection, extra: Sequence[str] = ()) -> list:
+    model = selection.resource.model
+    names = dict.fromkeys((*selection.scalars, *extra))
+    return [getattr(model, name) for name in names]
+
+
+def _relation_options(selection: Selection, parent=None) -> list:
+    options = []
+    for name, child in selection.children:
+        relation = getattr(selection.resource.model, name)
+        loader = joinedload(relation) if parent is None else parent.joinedload(relation)
+        options.append(loader.load_only(*_columns(child)))
+        options.extend(_relation_options(child, loader))
+    return options
+
+
+def loader_options(selection: Selection, keys: Sequence[str] = ()) -> list:
+    """
+    load_only/joinedload options for a query over the selection's root model.
+    `keys` are extra root columns the caller needs, e.g. pagination sort keys.
+    """
+    return [load_only(*_columns(selection, keys)), *_relation_options(selection)]
+
+
+@lru_cache(maxsize=256)
+def slim_model(selection: Selection) -> Type[BaseModel]:
+    schema = selection.resource.schema
+    definitions: Dict[str, Any] = {
+        name: (schema.model_fields[name].annotation, schema.model_fields[name])
+        for name in selection.scalars
+    }
+    for name, child in selection.children:
+        definitions[name] = (Optional[slim_model(child)], None)
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(selection: Selection) -> TypeAdapter:
+    return TypeAdapter(List[slim_model(selection)])
+
+
+def slim_response(selection: Selection, rows: Sequence[Any], response: Response) -> Response:
+    """
+    Serialize rows through the slim model, carrying over the pagination and
+    ETag headers already set on the endpoint's `response`.
+    """
+    adapter = _list_adapter(selection)
+    content = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    slim = Response(content=content, media_type="application/json")
+    for header in (NEXT_CURSOR_HEADER, ETAG_HEADER):
+        if header in response.headers:
+            slim.headers[header] = response.headers[header]
+    return slim
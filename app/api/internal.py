@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from app.cache.products import get_product_cache
+from app.cache.revenue import get_revenue_cache
+from app.db.database import get_db
+from app.services import sales_snapshot
+from app.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/cache")
+def cache_stats():
+    """
+    Hit/miss/eviction counters for the in-process caches
+    """
+    return {
+        "revenue": get_revenue_cache().stats(),
+        "products": get_product_cache().stats(),
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Process metrics (connection pool gauges and histograms) in the Prometheus
+    text exposition format
+    """
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+def _loaded_snapshot() -> sales_snapshot.SalesSnapshot:
+    snapshot = sales_snapshot.get_sales_snapshot()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sales snapshot is not loaded",
+        )
+    return snapshot
+
+
+@router.get("/sales-snapshot")
+def sales_snapshot_stats():
+    """
+    Size and age of the in-memory sales snapshot, if revenue queries use one
+    """
+    snapshot = sales_snapshot.get_sales_snapshot()
+    if snapshot is None:
+        return {"enabled": False}
+    return {"enabled": True, **snapshot.stats()}
+
+
+@router.post("/sales-snapshot/verify")
+def verify_sales_snapshot(db: Session = Depends(get_db)):
+    """
+    Compare the snapshot's per-day sale counts, units and revenue with the
+    sales table
+    """
+    return _loaded_snapshot().verify(db)
+
+
+@router.post("/sales-snapshot/reload")
+def reload_sales_snapshot(db: Session = Depends(get_db)):
+    """
+    Load (or reload) the snapshot from the sales table and serve revenue
+    queries from it
+    """
+    snapshot = sales_snapshot.load_sales_snapshot(db)
+    get_revenue_cache().clear()
+    return {"enabled": True, **snapshot.stats()}
+
+
+@router.post("/sales-snapshot/disable")
+def disable_sales_snapshot():
+    """
+    Drop the snapshot and answer revenue queries from the database again
+    """
+    sales_snapshot.disable_sales_snapshot()
+    get_revenue_cache().clear()
+    return {"enabled": False}
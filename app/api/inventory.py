@@ -1,63 +1,213 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from sqlalchemy.orm import Session, joinedload
-from typing import List
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from typing import List, Optional
+from datetime import datetime
+from app.db.database import get_db, get_read_db
 from app.models.models import Inventory as InventoryModel, InventoryHistory as InventoryHistoryModel, Product as ProductModel
+from app.models.models import inventory_stock_ratio
 from app.schemas.schemas import Inventory, InventoryUpdate, InventoryHistory, InventoryStatus, LowStockResponse
+from app.schemas.schemas import InventoryAdjustmentBatch, InventoryAdjustmentResponse
+from app.services import inventory_adjustments
+from app.cache.products import get_product, get_product_cache, is_missing_product
+from app.api.etags import not_modified
+from app.api.pagination import decode_cursor, keyset_filter, set_next_cursor
+from app.api import fast_json
+from app.api.fast_json import RowShape, fast_response
+from app.api.fields import INVENTORY, INVENTORY_HISTORY, PRODUCT, full_selection
+from app.api.fields import loader_options, parse_selection, slim_response
+from app.instrumentation import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/", response_model=List[Inventory])
-def list_inventory(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    inventory = db.query(InventoryModel).options(
-        joinedload(InventoryModel.product)
-    ).offset(skip).limit(limit).all()
+def list_inventory(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,quantity,product.sku"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to embed, e.g. product.category"),
+    db: Session = Depends(get_read_db)
+):
+    selection = parse_selection(INVENTORY, fields, expand)
+    query = db.query(InventoryModel).order_by(InventoryModel.id)
+    if selection is not None:
+        query = query.options(*loader_options(selection, ("id",)))
+    else:
+        query = query.options(
+            joinedload(InventoryModel.product).joinedload(ProductModel.category)
+        )
+
+    if cursor is not None:
+        query = query.filter(keyset_filter([InventoryModel.id], decode_cursor(cursor, int)))
+    else:
+        query = query.offset(skip)
+
+    inventory = query.limit(limit).all()
+    set_next_cursor(response, inventory, limit, lambda item: (item.id,))
+    if selection is not None:
+        return slim_response(selection, inventory, response)
     return inventory
 
 
+INVENTORY_STATUS_SORTS = ("id", "stock_ratio", "-stock_ratio")
+
+
+def _is_low_stock():
+    return InventoryModel.quantity <= InventoryModel.low_stock_threshold
+
+
+def _filter_inventory_status(
+    query,
+    category_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    low_stock: Optional[bool] = None,
+):
+    """Filters shared by the ORM query and the fast tuple select."""
+    if category_id is not None:
+        query = query.filter(ProductModel.category_id == category_id)
+    if is_active is not None:
+        query = query.filter(ProductModel.is_active == is_active)
+    if low_stock is True:
+        query = query.filter(_is_low_stock())
+    elif low_stock is False:
+        query = query.filter(InventoryModel.quantity > InventoryModel.low_stock_threshold)
+    return query
+
+
+def _inventory_status_query(
+    db: Session,
+    category_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    low_stock: Optional[bool] = None,
+):
+    query = (
+        db.query(
+            InventoryModel,
+            _is_low_stock().label("is_low_stock"),
+            inventory_stock_ratio.label("stock_ratio"),
+        )
+        .join(InventoryModel.product)
+        .options(
+            contains_eager(InventoryModel.product).joinedload(ProductModel.category)
+        )
+    )
+    return _filter_inventory_status(query, category_id, is_active, low_stock)
+
+
+def _inventory_status(row) -> InventoryStatus:
+    item = row.Inventory
+    return InventoryStatus(
+        product=item.product,
+        quantity=item.quantity,
+        low_stock_threshold=item.low_stock_threshold,
+        is_low_stock=row.is_low_stock,
+        stock_ratio=row.stock_ratio,
+    )
+
+
+def _inventory_status_rows(category_id, is_active, low_stock):
+    """
+    Tuple select for the fast path: the product's columns, then quantity,
+    threshold, is_low_stock, stock_ratio and id (the last two are the sort keys).
+    """
+    shape = RowShape(full_selection(PRODUCT))
+    stmt = select(
+        *shape.columns,
+        InventoryModel.quantity,
+        InventoryModel.low_stock_threshold,
+        _is_low_stock().label("is_low_stock"),
+        inventory_stock_ratio.label("stock_ratio"),
+        InventoryModel.id,
+    ).select_from(InventoryModel).join(InventoryModel.product)
+    stmt = shape.join_relations(stmt)
+    return shape, _filter_inventory_status(stmt, category_id, is_active, low_stock)
+
+
+def _fast_inventory_status(shape: RowShape, rows) -> List[dict]:
+    items = []
+    for row in rows:
+        product, end = shape.build(row)
+        quantity, threshold, is_low_stock, stock_ratio = row[end:end + 4]
+        items.append({
+            "product": product,
+            "quantity": quantity,
+            "low_stock_threshold": threshold,
+            "is_low_stock": is_low_stock,
+            "stock_ratio": stock_ratio,
+        })
+    return items
+
+
 @router.get("/status", response_model=List[InventoryStatus])
-def list_inventory_status(db: Session = Depends(get_db)):
-    inventory_items = db.query(InventoryModel).options(
-        joinedload(InventoryModel.product)
-    ).all()
-    
-    result = []
-    for item in inventory_items:
-        result.append(
-            InventoryStatus(
-                product=item.product,
-                quantity=item.quantity,
-                low_stock_threshold=item.low_stock_threshold,
-                is_low_stock=item.quantity <= item.low_stock_threshold
-            )
+def list_inventory_status(
+    response: Response,
+    category_id: Optional[int] = Query(None, description="Filter by product category"),
+    is_active: Optional[bool] = Query(None, description="Filter by product active flag"),
+    low_stock: Optional[bool] = Query(None, description="Only low (true) or healthy (false) stock"),
+    sort: str = Query("id", description="id, stock_ratio or -stock_ratio"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, gt=0, le=1000, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Resume after this cursor"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Stock status per product, computed in SQL and paginated by cursor.
+    `stock_ratio` is quantity divided by the low-stock threshold.
+    """
+    if sort not in INVENTORY_STATUS_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort: {sort}",
         )
-    
-    return result
+
+    fast = fast_json.FAST_JSON_RESPONSES
+    if fast:
+        shape, query = _inventory_status_rows(category_id, is_active, low_stock)
+    else:
+        query = _inventory_status_query(db, category_id, is_active, low_stock)
+    if sort == "id":
+        columns, types, descending = [InventoryModel.id], (int,), False
+    else:
+        columns = [inventory_stock_ratio, InventoryModel.id]
+        types, descending = (float, int), sort.startswith("-")
+
+    query = query.order_by(*(column.desc() if descending else column for column in columns))
+    if cursor is not None:
+        query = query.filter(keyset_filter(columns, decode_cursor(cursor, *types), descending))
+    else:
+        query = query.offset(skip)
+
+    if fast:
+        rows = db.execute(query.limit(limit)).all()
+        key = lambda row: tuple(row[-len(columns):])
+        set_next_cursor(response, rows, limit, key)
+        return fast_response(_fast_inventory_status(shape, rows), response)
+
+    rows = query.limit(limit).all()
+    if sort == "id":
+        key = lambda row: (row.Inventory.id,)
+    else:
+        key = lambda row: (row.stock_ratio, row.Inventory.id)
+    set_next_cursor(response, rows, limit, key)
+    return [_inventory_status(row) for row in rows]
 
 
 @router.get("/low-stock", response_model=LowStockResponse)
-def get_low_stock(db: Session = Depends(get_db)):
+def get_low_stock(db: Session = Depends(get_read_db)):
     """
-    Get products with low stock (where quantity <= low_stock_threshold)
+    Get products with low stock (where quantity <= low_stock_threshold),
+    most depleted first
     """
-    
-    inventory_items = db.query(InventoryModel).options(
-        joinedload(InventoryModel.product)
-    ).filter(
-        InventoryModel.quantity <= InventoryModel.low_stock_threshold
-    ).all()
-    
-    low_stock_items = []
-    for item in inventory_items:
-        low_stock_items.append(
-            InventoryStatus(
-                product=item.product,
-                quantity=item.quantity,
-                low_stock_threshold=item.low_stock_threshold,
-                is_low_stock=True
-            )
-        )
-    
+    rows = (
+        _inventory_status_query(db, low_stock=True)
+        .order_by(inventory_stock_ratio, InventoryModel.id)
+        .all()
+    )
+    low_stock_items = [_inventory_status(row) for row in rows]
+
     return LowStockResponse(
         low_stock_items=low_stock_items,
         total_count=len(low_stock_items)
@@ -65,7 +215,12 @@ def get_low_stock(db: Session = Depends(get_db)):
 
 
 @router.get("/{product_id}", response_model=Inventory)
-def get_product_inventory(product_id: int, db: Session = Depends(get_db)):
+def get_product_inventory(
+    product_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)
+):
+    unchanged = not_modified(db, request, response, ("inventory", "products", "categories"))
+    if unchanged is not None:
+        return unchanged
     inventory = db.query(InventoryModel).filter(
         InventoryModel.product_id == product_id
     ).options(
@@ -89,14 +244,17 @@ def update_inventory(
     change_reason: str = Body(...),
     db: Session = Depends(get_db)
 ):
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    product = get_product(db, product_id)
     if product is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product not found"
         )
     
-    inventory = db.query(InventoryModel).filter(InventoryModel.product_id == product_id).first()
+    # Lock the row so concurrent updates cannot compute history from a stale quantity
+    inventory = db.query(InventoryModel).filter(
+        InventoryModel.product_id == product_id
+    ).with_for_update().first()
     if inventory is None:
         # Create inventory if it doesn't exist
         inventory = InventoryModel(
@@ -124,29 +282,81 @@ def update_inventory(
             )
             db.add(history)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not is_missing_product(e):
+            raise
+        get_product_cache().invalidate(product_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product not found"
+        )
     db.refresh(inventory)
     return inventory
 
 
+@router.post("/adjustments", response_model=InventoryAdjustmentResponse)
+def adjust_inventory(batch: InventoryAdjustmentBatch, db: Session = Depends(get_db)):
+    """
+    Apply many relative (`delta`) or absolute (`quantity`) stock changes in one
+    transaction. Either every adjustment is applied or none is.
+    """
+    try:
+        return inventory_adjustments.apply_adjustments(db, batch)
+    except inventory_adjustments.MissingInventory as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except inventory_adjustments.NegativeStock as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+
+
 @router.get("/history/{product_id}", response_model=List[InventoryHistory])
 def get_inventory_history(
     product_id: int, 
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,quantity_change,change_timestamp"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to embed, e.g. product.category"),
+    db: Session = Depends(get_read_db)
 ):
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    selection = parse_selection(INVENTORY_HISTORY, fields, expand)
+    product = get_product(db, product_id)
     if product is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product not found"
         )
 
-    history = db.query(InventoryHistoryModel).filter(
+    query = db.query(InventoryHistoryModel).filter(
         InventoryHistoryModel.product_id == product_id
     ).order_by(
-        InventoryHistoryModel.change_timestamp.desc()
-    ).offset(skip).limit(limit).all()
-    
+        InventoryHistoryModel.change_timestamp.desc(),
+        InventoryHistoryModel.id.desc()
+    )
+    if selection is not None:
+        query = query.options(*loader_options(selection, ("change_timestamp", "id")))
+
+    if cursor is not None:
+        values = decode_cursor(cursor, datetime.fromisoformat, int)
+        query = query.filter(keyset_filter(
+            [InventoryHistoryModel.change_timestamp, InventoryHistoryModel.id],
+            values,
+            descending=True
+        ))
+    else:
+        query = query.offset(skip)
+
+    history = query.limit(limit).all()
+    set_next_cursor(response, history, limit, lambda item: (item.change_timestamp, item.id))
+    if selection is not None:
+        return slim_response(selection, history, response)
     return history 
\ No newline at end of file
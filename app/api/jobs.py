@@ -0,0 +1,118 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_db, get_read_db
+from app.models.models import Job as JobModel
+from app.schemas.schemas import Job, JobCreate
+from app.services import jobs
+from app.api.pagination import decode_cursor, set_next_cursor
+from app.instrumentation import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+def _get_job(db: Session, job_id: int) -> JobModel:
+    job = db.get(JobModel, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found"
+        )
+    return job
+
+
+@router.post("/", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(job: JobCreate, db: Session = Depends(get_db)):
+    """
+    Queue a background job. Poll GET /api/jobs/{job_id} for its status and
+    progress.
+    """
+    try:
+        return jobs.submit_job(db, job.kind, job.params)
+    except jobs.JobsDisabled as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+    except jobs.UnknownJobKind as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{e}; expected one of: {', '.join(sorted(jobs.JOB_KINDS))}",
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False),
+        )
+    except jobs.QueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+
+@router.get("/", response_model=List[Job])
+def list_jobs(
+    response: Response,
+    job_status: Optional[str] = Query(None, alias="status", description="Filter by status"),
+    kind: Optional[str] = Query(None, description="Filter by job kind"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    before_id = decode_cursor(cursor, int)[0] if cursor is not None else None
+    rows = jobs.list_jobs(db, job_status, kind, before_id, skip, limit)
+    set_next_cursor(response, rows, limit, lambda job: (job.id,))
+    return rows
+
+
+@router.get("/{job_id}", response_model=Job)
+def retrieve_job(job_id: int, db: Session = Depends(get_db)):
+    # Progress is written on the primary; a replica could show it lagging
+    return _get_job(db, job_id)
+
+
+@router.post("/{job_id}/cancel", response_model=Job)
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Cancel a queued job, or ask a running one to stop at its next checkpoint
+    """
+    try:
+        return jobs.cancel_job(db, job_id)
+    except jobs.JobNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found"
+        )
+    except jobs.JobFinished as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+
+
+@router.get("/{job_id}/result", response_class=FileResponse)
+def download_job_result(job_id: int, db: Session = Depends(get_db)):
+    """
+    Download the file written by a finished job, e.g. a sales export
+    """
+    job = _get_job(db, job_id)
+    if job.status != jobs.SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status}",
+        )
+    if job.result_path is None or not os.path.exists(job.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job has no result file"
+        )
+    return FileResponse(
+        job.result_path,
+        media_type=job.result.get("media_type"),
+        filename=job.result.get("filename"),
+    )
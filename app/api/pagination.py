@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = json.dumps(
+        [_encode_value(value) for value in values], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple:
+    """
+    Decode an opaque cursor back into typed sort-key values.
+
+    `types` converts each position, e.g. (date.fromisoformat, int).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor has the wrong shape")
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_filter(
+    columns: Sequence[Any], values: Sequence[Any], descending: bool = False
+):
+    """Row-value comparison that resumes strictly after `values` in sort order."""
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def set_next_cursor(
+    response: Response,
+    rows: Sequence[Any],
+    limit: int,
+    key: Callable[[Any], tuple],
+) -> Optional[str]:
+    """Advertise the cursor for the following page when this page was full."""
+    if not rows or len(rows) < limit:
+        return None
+    cursor = encode_cursor(*key(rows[-1]))
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    return cursor
@@ -1,37 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.models.models import Product as ProductModel
 from app.schemas.schemas import Product, ProductCreate, ProductUpdate
+from app.services import product_search, revenue_rollup, sales_snapshot
+from app.cache.products import get_product, get_product_cache, is_sku_conflict
+from app.cache.revenue import get_revenue_cache
+from app.api.etags import not_modified
+from app.api.pagination import decode_cursor, keyset_filter, set_next_cursor
+from app.api.fields import PRODUCT, loader_options, parse_selection, slim_response
+from app.instrumentation import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+def _sku_exists(sku: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Product with SKU {sku} already exists"
+    )
+
+
+def _commit_product(db: Session, sku: Optional[str]) -> None:
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if sku is None or not is_sku_conflict(e):
+            raise
+        raise _sku_exists(sku)
 
-router = APIRouter()
 
 @router.post("/", response_model=Product, status_code=status.HTTP_201_CREATED)
 def create_product(product: ProductCreate, db: Session = Depends(get_db)):
-    db_product = db.query(ProductModel).filter(ProductModel.sku == product.sku).first()
-    if db_product:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Product with SKU {product.sku} already exists"
-        )
-    
+    # A cached SKU is known to be taken; otherwise the unique index decides
+    if get_product_cache().get_by_sku(product.sku) is not None:
+        raise _sku_exists(product.sku)
+
     db_product = ProductModel(**product.model_dump())
     db.add(db_product)
-    db.commit()
+    _commit_product(db, product.sku)
     db.refresh(db_product)
     return db_product
 
 
 @router.get("/", response_model=List[Product])
 def list_products(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     category_id: Optional[int] = None, 
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,sku,category.name"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to embed, e.g. category"),
+    db: Session = Depends(get_read_db)
 ):
+    selection = parse_selection(PRODUCT, fields, expand)
+    unchanged = not_modified(db, request, response, ("products", "categories"))
+    if unchanged is not None:
+        return unchanged
     query = db.query(ProductModel)
+    if selection is not None:
+        query = query.options(*loader_options(selection, ("id",)))
+    else:
+        query = query.options(joinedload(ProductModel.category))
     
     if category_id is not None:
         query = query.filter(ProductModel.category_id == category_id)
@@ -39,13 +75,66 @@ def list_products(
     if is_active is not None:
         query = query.filter(ProductModel.is_active == is_active)
     
-    products = query.offset(skip).limit(limit).all()
+    query = query.order_by(ProductModel.id)
+    if cursor is not None:
+        query = query.filter(keyset_filter([ProductModel.id], decode_cursor(cursor, int)))
+    else:
+        query = query.offset(skip)
+
+    products = query.limit(limit).all()
+    set_next_cursor(response, products, limit, lambda product: (product.id,))
+    if selection is not None:
+        return slim_response(selection, products, response)
+    return products
+
+
+@router.get("/search", response_model=List[Product])
+def search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100, description="Name or description words, or a name or SKU fragment"),
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,sku,category.name"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to embed, e.g. category"),
+    db: Session = Depends(get_read_db)
+):
+    """Products matching `q`, best match first."""
+    selection = parse_selection(PRODUCT, fields, expand)
+    match, rank = product_search.search_terms(q)
+    query = db.query(ProductModel, rank.label("rank")).filter(match)
+    if selection is not None:
+        query = query.options(*loader_options(selection, ("id",)))
+    else:
+        query = query.options(joinedload(ProductModel.category))
+
+    if category_id is not None:
+        query = query.filter(ProductModel.category_id == category_id)
+
+    if is_active is not None:
+        query = query.filter(ProductModel.is_active == is_active)
+
+    query = query.order_by(rank.desc(), ProductModel.id.desc())
+    if cursor is not None:
+        query = query.filter(
+            keyset_filter([rank, ProductModel.id], decode_cursor(cursor, float, int), descending=True)
+        )
+    else:
+        query = query.offset(skip)
+
+    rows = query.limit(limit).all()
+    set_next_cursor(response, rows, limit, lambda row: (row.rank, row[0].id))
+    products = [row[0] for row in rows]
+    if selection is not None:
+        return slim_response(selection, products, response)
     return products
 
 
 @router.get("/{product_id}", response_model=Product)
-def retrieve_product(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+def retrieve_product(product_id: int, db: Session = Depends(get_read_db)):
+    product = get_product(db, product_id)
     if product is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,21 +153,27 @@ def update_product(product_id: int, product: ProductUpdate, db: Session = Depend
         )
     
     if product.sku is not None and product.sku != db_product.sku:
-        sku_exists = db.query(ProductModel).filter(
-            ProductModel.sku == product.sku, 
-            ProductModel.id != product_id
-        ).first()
-        if sku_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Product with SKU {product.sku} already exists"
-            )
+        owner = get_product_cache().get_by_sku(product.sku)
+        if owner is not None and owner.id != product_id:
+            raise _sku_exists(product.sku)
     
     update_data = product.model_dump(exclude_unset=True)
+    category_changed = (
+        "category_id" in update_data
+        and update_data["category_id"] != db_product.category_id
+    )
+    if category_changed:
+        revenue_rollup.reassign_category(db, product_id, update_data["category_id"])
+
     for key, value in update_data.items():
         setattr(db_product, key, value)
     
-    db.commit()
+    _commit_product(db, product.sku)
+    get_product_cache().invalidate(product_id)
+    if category_changed:
+        # Category-filtered revenue for any date may have moved
+        get_revenue_cache().clear()
+        sales_snapshot.record_category(product_id, update_data["category_id"])
     db.refresh(db_product)
     return db_product
 
@@ -94,4 +189,5 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_product)
     db.commit()
+    get_product_cache().invalidate(product_id)
     return None 
\ No newline at end of file
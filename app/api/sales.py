@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, extract, cast, Integer, Numeric, and_, or_
+from sqlalchemy import func, extract, cast, select, Integer, Numeric, and_, or_
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from app.db.database import get_db
+import os
+from app.db.database import get_db, get_read_db
 from app.models.models import Sale as SaleModel, Product as ProductModel
 from app.schemas.schemas import (
     Sale,
@@ -12,42 +16,191 @@ from app.schemas.schemas import (
     SalesFilter,
     DateRangeFilter,
     RevenueComparison,
+    PeriodComparison,
 )
-from app.schemas.schemas import RevenueData, RevenueResponse, RevenueComparisonResponse
-
-router = APIRouter()
+from app.schemas.schemas import RevenueResponse, RevenueComparisonResponse
+from app.schemas.schemas import RevenueSeriesResponse, BulkSaleResponse
+from app.schemas.schemas import PeriodComparisonResponse, TopSellersResponse
+from app.services import inventory_adjustments, revenue_queries, revenue_rollup, sales_export, sales_ingest
+from app.services.sales_snapshot import get_sales_snapshot, record_sales
+from app.cache.products import get_product, get_product_cache, is_missing_product
+from app.cache.revenue import cached_revenue, date_range_params, get_revenue_cache
+from app.cache.revenue import comparison_range_params, period_comparison_range_params
+from app.api.pagination import decode_cursor, keyset_filter, set_next_cursor
+from app.api import fast_json
+from app.api.fast_json import RowShape, fast_response
+from app.api.fields import SALE, full_selection, loader_options, parse_selection, slim_response
+from app.instrumentation import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+EXPORT_BATCH_SIZE = int(os.getenv("SALES_EXPORT_BATCH_SIZE", "5000"))
+BULK_BATCH_SIZE = int(os.getenv("SALES_BULK_BATCH_SIZE", "5000"))
 
 
 @router.post("/", response_model=Sale, status_code=status.HTTP_201_CREATED)
 def create_sale(sale: SaleCreate, db: Session = Depends(get_db)):
-    product = db.query(ProductModel).filter(ProductModel.id == sale.product_id).first()
+    product = get_product(db, sale.product_id)
     if product is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product not found",
         )
 
+    if inventory_adjustments.SALES_DECREMENT_STOCK != "off":
+        refused, _ = inventory_adjustments.decrement_stock(
+            db,
+            [(sale.product_id, sale.quantity)],
+            backorder=inventory_adjustments.SALES_DECREMENT_STOCK == "backorder",
+        )
+        if refused:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=refused[0],
+            )
+
     db_sale = SaleModel(**sale.model_dump())
     db.add(db_sale)
-    db.commit()
+    try:
+        revenue_rollup.apply_sales(db, [db_sale], {product.id: product.category_id})
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not is_missing_product(e):
+            raise
+        get_product_cache().invalidate(product.id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Product not found",
+        )
+    get_revenue_cache().invalidate_date(db_sale.sales_date)
+    record_sales([db_sale], {product.id: product.category_id})
     db.refresh(db_sale)
     return db_sale
 
 
-@router.get("/", response_model=List[Sale])
-def list_sales(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    sales = (
-        db.query(SaleModel)
-        .options(joinedload(SaleModel.product))
-        .offset(skip)
-        .limit(limit)
-        .all()
+@router.post("/bulk", response_model=BulkSaleResponse)
+async def create_sales_bulk(
+    request: Request,
+    batch_size: int = Query(
+        BULK_BATCH_SIZE, gt=0, description="Rows loaded per COPY statement"
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Ingest many sales from a JSON array, NDJSON or CSV body
+
+    Rows that fail validation or reference an unknown product are reported
+    by their zero-based position and skipped; the rest are inserted together.
+    """
+    body = await request.body()
+    try:
+        rows = sales_ingest.parse_payload(body, request.headers.get("content-type", ""))
+    except sales_ingest.UnsupportedPayload as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed request body: {e}",
+        )
+
+    return await run_in_threadpool(sales_ingest.ingest_sales, db, rows, batch_size)
+
+
+SALES_SORT_KEY = (SaleModel.sales_date, SaleModel.id)
+
+
+def _sales_cursor_key(sale):
+    return sale.sales_date, sale.id
+
+
+def _sales_query(db: Session, selection):
+    query = db.query(SaleModel)
+    if selection is not None:
+        return query.options(*loader_options(selection, ("sales_date", "id")))
+    return query.options(
+        joinedload(SaleModel.product).joinedload(ProductModel.category)
     )
+
+
+def _paginate_sales(query, skip: int, limit: int, cursor: Optional[str]):
+    query = query.order_by(SaleModel.sales_date.desc(), SaleModel.id.desc())
+    if cursor is not None:
+        values = decode_cursor(cursor, date.fromisoformat, int)
+        return query.filter(keyset_filter(SALES_SORT_KEY, values, descending=True))
+    return query.offset(skip)
+
+
+def _filter_sales(
+    query,
+    start_date: date,
+    end_date: date,
+    product_id: Optional[int],
+    category_id: Optional[int],
+    platform: Optional[str],
+    join_product: bool = True,
+):
+    """Filters shared by the ORM query and the fast tuple select."""
+    query = query.filter(
+        SaleModel.sales_date >= start_date, SaleModel.sales_date <= end_date
+    )
+
+    if product_id is not None:
+        query = query.filter(SaleModel.product_id == product_id)
+
+    if category_id is not None:
+        if join_product:
+            query = query.join(ProductModel)
+        query = query.filter(ProductModel.category_id == category_id)
+
+    if platform is not None:
+        query = query.filter(SaleModel.platform == platform)
+    return query
+
+
+def _sales_rows(selection):
+    """Tuple select for the fast path; the sort key is selected last so cursors work with any `fields`."""
+    shape = RowShape(selection or full_selection(SALE))
+    stmt = select(*shape.columns, *SALES_SORT_KEY).select_from(SaleModel)
+    return shape, shape.join_relations(stmt)
+
+
+def _fast_sales(db: Session, shape: RowShape, stmt, skip, limit, cursor, response):
+    rows = db.execute(_paginate_sales(stmt, skip, limit, cursor).limit(limit)).all()
+    set_next_cursor(response, rows, limit, lambda row: tuple(row[-2:]))
+    return fast_response(shape.build_all(rows), response)
+
+
+@router.get("/", response_model=List[Sale])
+def list_sales(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Resume after this cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,sales_date,product.sku"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to embed, e.g. product.category"),
+    db: Session = Depends(get_read_db),
+):
+    selection = parse_selection(SALE, fields, expand)
+    if fast_json.FAST_JSON_RESPONSES:
+        shape, stmt = _sales_rows(selection)
+        return _fast_sales(db, shape, stmt, skip, limit, cursor, response)
+
+    query = _sales_query(db, selection)
+    sales = _paginate_sales(query, skip, limit, cursor).limit(limit).all()
+    set_next_cursor(response, sales, limit, _sales_cursor_key)
+    if selection is not None:
+        return slim_response(selection, sales, response)
     return sales
 
 
 @router.get("/filter", response_model=List[Sale])
 def filter_sales(
+    response: Response,
     start_date: date = Query(..., description="Start date for filtering sales"),
     end_date: date = Query(..., description="End date for filtering sales"),
     product_id: Optional[int] = Query(None, description="Filter by product ID"),
@@ -55,200 +208,226 @@ def filter_sales(
     platform: Optional[str] = Query(None, description="Filter by platform"),
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(100, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Resume after this cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,sales_date,product.sku"),
+    expand: Optional[str] = Query(None, description="Comma-separated relations to embed, e.g. product.category"),
+    db: Session = Depends(get_read_db),
 ):
     """
     Filter sales by date range, product, category, or platform
     """
-    query = db.query(SaleModel).options(joinedload(SaleModel.product))
+    selection = parse_selection(SALE, fields, expand)
+    if fast_json.FAST_JSON_RESPONSES:
+        shape, stmt = _sales_rows(selection)
+        stmt = _filter_sales(
+            stmt, start_date, end_date, product_id, category_id, platform,
+            join_product=not shape.joins("product"),
+        )
+        return _fast_sales(db, shape, stmt, skip, limit, cursor, response)
 
-    query = query.filter(
-        SaleModel.sales_date >= start_date, SaleModel.sales_date <= end_date
+    query = _filter_sales(
+        _sales_query(db, selection), start_date, end_date, product_id, category_id, platform
     )
-    
-    if product_id is not None:
-        query = query.filter(SaleModel.product_id == product_id)
+    sales = _paginate_sales(query, skip, limit, cursor).limit(limit).all()
+    set_next_cursor(response, sales, limit, _sales_cursor_key)
+    if selection is not None:
+        return slim_response(selection, sales, response)
+    return sales
 
-    if category_id is not None:
-        query = query.join(ProductModel).filter(ProductModel.category_id == category_id)
-        
-    if platform is not None:
-        query = query.filter(SaleModel.platform == platform)
 
-    sales = query.order_by(SaleModel.sales_date.desc()).offset(skip).limit(limit).all()
-    return sales
+@router.get("/export", response_class=StreamingResponse)
+def export_sales(
+    start_date: date = Query(..., description="Start date for filtering sales"),
+    end_date: date = Query(..., description="End date for filtering sales"),
+    product_id: Optional[int] = Query(None, description="Filter by product ID"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    platform: Optional[str] = Query(None, description="Filter by platform"),
+    export_format: str = Query(
+        "csv", alias="format", description="Export format: csv or ndjson"
+    ),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Stream every matching sale as CSV or NDJSON from a server-side cursor
+    """
+    if export_format not in sales_export.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {export_format}",
+        )
+
+    stmt = sales_export.export_statement(
+        start_date, end_date, product_id, category_id, platform
+    )
+    result = db.execute(
+        stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    filename = f"sales_{start_date}_{end_date}.{export_format}"
+    return StreamingResponse(
+        sales_export.iter_export(result, export_format),
+        media_type=sales_export.EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _revenue_rows(db: Session, query: str, *args):
+    """
+    Rows for the revenue_queries builder named `query`, answered from the
+    in-memory sales snapshot when one is loaded and from SQL otherwise.
+    """
+    snapshot = get_sales_snapshot()
+    if snapshot is not None:
+        return getattr(snapshot, query)(*args)
+    return db.execute(getattr(revenue_queries, query)(*args)).all()
+
+
+def _top_seller_rows(db: Session, start_date, end_date, group_by, *args):
+    snapshot = get_sales_snapshot()
+    if snapshot is None:
+        return db.execute(
+            revenue_queries.top_sellers(start_date, end_date, group_by, *args)
+        ).all()
+
+    # Snapshot rows carry keys only; names come from one lookup of the ranked keys
+    rows = snapshot.top_sellers(start_date, end_date, group_by, *args)
+    stmt = revenue_queries.top_seller_names(group_by, [row.key for row in rows])
+    if stmt is not None and rows:
+        names = {key: (name, sku) for key, name, sku in db.execute(stmt).all()}
+        for row in rows:
+            row.name, row.sku = names.get(row.key, (None, None))
+    return rows
+
+
+@router.get("/top", response_model=TopSellersResponse)
+@cached_revenue("sales/top", date_range_params)
+def get_top_sellers(
+    start_date: date = Query(..., description="Start date of the ranking window"),
+    end_date: date = Query(..., description="End date of the ranking window"),
+    group_by: str = Query("product", description="product, category or platform"),
+    metric: str = Query("revenue", description="Rank by revenue or units"),
+    limit: int = Query(10, gt=0, le=100, description="Number of groups to return"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    platform: Optional[str] = Query(None, description="Filter by platform"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Best sellers over a date range, ranked in one query with their share of
+    total revenue
+    """
+    try:
+        rows = _top_seller_rows(
+            db, start_date, end_date, group_by, metric, limit, category_id, platform
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return revenue_queries.top_sellers_response(rows, start_date, end_date, group_by, metric)
 
 
 @router.get("/revenue/daily", response_model=RevenueResponse)
+@cached_revenue("revenue/daily", date_range_params)
 def get_daily_revenue(
     start_date: date = Query(..., description="Start date for revenue calculation"),
     end_date: date = Query(..., description="End date for revenue calculation"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    revenue_data = (
-        db.query(
-            SaleModel.sales_date.label("date"),
-            func.sum(SaleModel.total_price).label("revenue"),
-        )
-        .filter(SaleModel.sales_date >= start_date, SaleModel.sales_date <= end_date)
-        .group_by(SaleModel.sales_date)
-        .order_by(SaleModel.sales_date)
-        .all()
-    )
-    result = [
-        RevenueData(date=item.date, revenue=item.revenue) for item in revenue_data
-    ]
-    total_revenue = sum(item.revenue for item in result)
-
-    return RevenueResponse(data=result, total_revenue=total_revenue)
+    rows = _revenue_rows(db, "daily_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
 
 
 @router.get("/revenue/weekly", response_model=RevenueResponse)
+@cached_revenue("revenue/weekly", date_range_params)
 def get_weekly_revenue(
     start_date: date = Query(..., description="Start date for revenue calculation"),
     end_date: date = Query(..., description="End date for revenue calculation"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    revenue_data = (
-        db.query(
-            extract("year", SaleModel.sales_date).label("year"),
-            extract("week", SaleModel.sales_date).label("week"),
-            func.min(SaleModel.sales_date).label(
-                "date"
-            ),  # Use first day of week as date
-            func.sum(SaleModel.total_price).label("revenue"),
-        )
-        .filter(SaleModel.sales_date >= start_date, SaleModel.sales_date <= end_date)
-        .group_by(
-            extract("year", SaleModel.sales_date), extract("week", SaleModel.sales_date)
-        )
-        .order_by(
-            extract("year", SaleModel.sales_date), extract("week", SaleModel.sales_date)
-        )
-        .all()
-    )
-    result = [
-        RevenueData(date=item.date, revenue=item.revenue) for item in revenue_data
-    ]
-
-    total_revenue = sum(item.revenue for item in result)
-
-    return RevenueResponse(data=result, total_revenue=total_revenue)
+    rows = _revenue_rows(db, "weekly_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
 
 
 @router.get("/revenue/monthly", response_model=RevenueResponse)
+@cached_revenue("revenue/monthly", date_range_params)
 def get_monthly_revenue(
     start_date: date = Query(..., description="Start date for revenue calculation"),
     end_date: date = Query(..., description="End date for revenue calculation"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    revenue_data = (
-        db.query(
-            extract("year", SaleModel.sales_date).label("year"),
-            extract("month", SaleModel.sales_date).label("month"),
-            func.min(SaleModel.sales_date).label(
-                "date"
-            ),  # Use first day of month as date
-            func.sum(SaleModel.total_price).label("revenue"),
-        )
-        .filter(SaleModel.sales_date >= start_date, SaleModel.sales_date <= end_date)
-        .group_by(
-            extract("year", SaleModel.sales_date),
-            extract("month", SaleModel.sales_date),
-        )
-        .order_by(
-            extract("year", SaleModel.sales_date),
-            extract("month", SaleModel.sales_date),
-        )
-        .all()
-    )
-    result = [
-        RevenueData(date=item.date, revenue=item.revenue) for item in revenue_data
-    ]
-    total_revenue = sum(item.revenue for item in result)
-
-    return RevenueResponse(data=result, total_revenue=total_revenue)
+    rows = _revenue_rows(db, "monthly_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
 
 
 @router.get("/revenue/yearly", response_model=RevenueResponse)
+@cached_revenue("revenue/yearly", date_range_params)
 def get_yearly_revenue(
     start_date: date = Query(..., description="Start date for revenue calculation"),
     end_date: date = Query(..., description="End date for revenue calculation"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    revenue_data = (
-        db.query(
-            extract("year", SaleModel.sales_date).label("year"),
-            func.make_date(
-                cast(extract("year", SaleModel.sales_date), Integer), 1, 1
-            ).label(
-                "date"
-            ), 
-            func.sum(SaleModel.total_price).label("revenue"),
+    rows = _revenue_rows(db, "yearly_revenue", start_date, end_date)
+    return revenue_queries.revenue_response(rows)
+
+
+@router.get("/revenue/series", response_model=RevenueSeriesResponse)
+@cached_revenue("revenue/series", date_range_params)
+def get_revenue_series(
+    start_date: date = Query(..., description="Start date for revenue calculation"),
+    end_date: date = Query(..., description="End date for revenue calculation"),
+    granularity: str = Query(
+        "day,week,month,year",
+        description="Comma-separated list of day, week, month and/or year",
+    ),
+    breakdown: Optional[str] = Query(
+        None, description="Split every series by category or platform"
+    ),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    platform: Optional[str] = Query(None, description="Filter by platform"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Revenue for several granularities from a single GROUPING SETS query.
+
+    Week, month and year buckets are dated by their first calendar day.
+    """
+    try:
+        granularities = revenue_queries.parse_granularities(granularity)
+        rows = _revenue_rows(
+            db, "revenue_series", start_date, end_date, granularities, breakdown, category_id, platform
         )
-        .filter(SaleModel.sales_date >= start_date, SaleModel.sales_date <= end_date)
-        .group_by(extract("year", SaleModel.sales_date))
-        .order_by(extract("year", SaleModel.sales_date))
-        .all()
-    )
-    result = [
-        RevenueData(date=item.date, revenue=item.revenue) for item in revenue_data
-    ]
-    total_revenue = sum(item.revenue for item in result)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return RevenueResponse(data=result, total_revenue=total_revenue)
+    return revenue_queries.revenue_series_response(
+        rows, granularities, breakdown, category_id, platform
+    )
 
 
 @router.post("/revenue/compare", response_model=RevenueComparisonResponse)
-def compare_revenue(comparison: RevenueComparison, db: Session = Depends(get_db)):
+@cached_revenue("revenue/compare", comparison_range_params)
+def compare_revenue(comparison: RevenueComparison, db: Session = Depends(get_read_db)):
     """
     Compare revenue between two periods
     """
-    query = db.query(func.sum(SaleModel.total_price).label("revenue"))
+    periods = revenue_queries.comparison_periods(comparison)
+    row = _revenue_rows(db, "period_comparison", periods, None, comparison.category_id)[0]
+    return revenue_queries.comparison_response(comparison, row.revenue_0, row.revenue_1)
 
-    if comparison.category_id is not None:
-        query = query.join(ProductModel).filter(
-            ProductModel.category_id == comparison.category_id
-        )
 
-    period1_revenue = query.filter(
-        SaleModel.sales_date >= comparison.period1_start,
-        SaleModel.sales_date <= comparison.period1_end,
-    ).scalar() or Decimal("0.0")
-
-    period2_revenue = query.filter(
-        SaleModel.sales_date >= comparison.period2_start,
-        SaleModel.sales_date <= comparison.period2_end,
-    ).scalar() or Decimal("0.0")
-
-    if period1_revenue == 0:
-        percentage_change = Decimal("100.0") if period2_revenue > 0 else Decimal("0.0")
-    else:
-        percentage_change = (
-            (period2_revenue - period1_revenue) / period1_revenue
-        ) * 100
-
-    period1_days = (comparison.period1_end - comparison.period1_start).days + 1
-    period2_days = (comparison.period2_end - comparison.period2_start).days + 1
-
-    return RevenueComparisonResponse(
-        period1={
-            "start_date": comparison.period1_start,
-            "end_date": comparison.period1_end,
-            "revenue": period1_revenue,
-            "days": period1_days,
-            "daily_avg": (
-                period1_revenue / period1_days if period1_days > 0 else Decimal("0.0")
-            ),
-        },
-        period2={
-            "start_date": comparison.period2_start,
-            "end_date": comparison.period2_end,
-            "revenue": period2_revenue,
-            "days": period2_days,
-            "daily_avg": (
-                period2_revenue / period2_days if period2_days > 0 else Decimal("0.0")
-            ),
-        },
-        percentage_change=percentage_change,
+@router.post("/revenue/compare/periods", response_model=PeriodComparisonResponse)
+@cached_revenue("revenue/compare/periods", period_comparison_range_params)
+def compare_revenue_periods(comparison: PeriodComparison, db: Session = Depends(get_read_db)):
+    """
+    Compare revenue and units across any number of periods, optionally broken
+    down by category, platform or product, with period-over-period deltas
+    """
+    rows = _revenue_rows(
+        db,
+        "period_comparison",
+        comparison.periods,
+        comparison.breakdown,
+        comparison.category_id,
+        comparison.platform,
+        comparison.product_id,
     )
+    return revenue_queries.period_comparison_response(comparison, rows)
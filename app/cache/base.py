@@ -0,0 +1,242 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+DateRange = Tuple[date, date]
+
+# How long InMemoryCache remembers when each day was last invalidated
+INVALIDATION_MEMORY_SECONDS = 3600.0
+
+
+class CacheBackend:
+    """
+    Interface for date-range aware result caches.
+
+    Every entry records the date ranges it was computed from so writes can
+    drop only the entries that cover the changed day.
+    """
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, ranges: Iterable[DateRange]) -> None:
+        raise NotImplementedError
+
+    def invalidate_date(self, day: date) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @property
+    def epoch(self) -> int:
+        """Counter bumped by every invalidation; used to discard racing fills."""
+        return 0
+
+    def invalidated_within(self, ranges: Iterable[DateRange], seconds: float) -> bool:
+        """
+        Whether a day in `ranges` was invalidated in the last `seconds`.
+        Backends that do not track this answer True, so nothing is stored.
+        """
+        return True
+
+    def get_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        ranges: Iterable[DateRange],
+        compute: Callable[[], Any],
+        staleness: float = 0.0,
+    ) -> Any:
+        """
+        Cached value for the key, else compute it. `staleness` bounds how far
+        behind the data `compute` reads may be (replica lag); a miss is only
+        stored when none of its days were invalidated within that window.
+        """
+        key = make_key(endpoint, params)
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        ranges = list(ranges)
+        epoch = self.epoch
+        store = not staleness or not self.invalidated_within(ranges, staleness)
+        value = compute()
+        # A write that landed while we were computing may not be reflected in
+        # `value`, so only store it if nothing was invalidated in between.
+        if store and self.epoch == epoch:
+            self.set(key, value, ranges)
+        return value
+
+    async def aget_or_compute(
+        self,
+        endpoint: str,
+        params: Dict[str, Any],
+        ranges: Iterable[DateRange],
+        compute: Callable[[], Awaitable[Any]],
+        staleness: float = 0.0,
+    ) -> Any:
+        """Async counterpart of get_or_compute for coroutine handlers."""
+        key = make_key(endpoint, params)
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        ranges = list(ranges)
+        epoch = self.epoch
+        store = not staleness or not self.invalidated_within(ranges, staleness)
+        value = await compute()
+        if store and self.epoch == epoch:
+            self.set(key, value, ranges)
+        return value
+
+
+def _normalize(value: Any) -> Hashable:
+    if hasattr(value, "model_dump"):
+        return _normalize(value.model_dump())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def make_key(endpoint: str, params: Dict[str, Any]) -> Hashable:
+    return (endpoint, _normalize(params))
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything, for disabling caching."""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return False, None
+
+    def set(self, key, value, ranges):
+        pass
+
+    def invalidate_date(self, day):
+        return 0
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {"backend": "none", "misses": self.misses}
+
+
+class InMemoryCache(CacheBackend):
+    """Thread-safe LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, List[DateRange]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._epoch = 0
+        # Monotonic time each day was last invalidated, and of the last clear()
+        self._invalidated: Dict[date, float] = {}
+        self._cleared_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def invalidated_within(self, ranges, seconds):
+        if seconds > INVALIDATION_MEMORY_SECONDS:
+            return True
+        since = time.monotonic() - seconds
+        with self._lock:
+            if self._cleared_at > since:
+                return True
+            return any(
+                at > since and any(start <= day <= end for start, end in ranges)
+                for day, at in self._invalidated.items()
+            )
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value, ranges):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, list(ranges))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_date(self, day):
+        with self._lock:
+            self._epoch += 1
+            now = time.monotonic()
+            self._invalidated[day] = now
+            if len(self._invalidated) > self.max_entries:
+                self._invalidated = {
+                    day: at
+                    for day, at in self._invalidated.items()
+                    if at > now - INVALIDATION_MEMORY_SECONDS
+                }
+            stale = [
+                key
+                for key, (_, _, ranges) in self._entries.items()
+                if any(start <= day <= end for start, end in ranges)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._cleared_at = time.monotonic()
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
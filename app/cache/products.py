@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from app.db.database import is_replica_session
+from app.models.models import Product as ProductModel
+from app.schemas.schemas import Product
+
+load_dotenv()
+
+# Single-product lookups by id and SKU. Entries are validated Product schemas
+# (category included), so a hit needs no database round trip at all. Product
+# and category writes invalidate in this process; other workers only notice
+# after PRODUCT_CACHE_TTL_SECONDS, which bounds staleness across processes.
+PRODUCT_CACHE_MAX_ENTRIES = int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "10000"))
+PRODUCT_CACHE_TTL_SECONDS = float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "60"))
+PRODUCT_CACHE_WARM = os.getenv("PRODUCT_CACHE_WARM", "false").lower() in ("1", "true", "yes")
+
+SKU_CONSTRAINT = "ix_products_sku"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+class ProductCache:
+    """Thread-safe LRU of products by id, with a secondary SKU index."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Product]]" = OrderedDict()
+        self._skus: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, product_id: int) -> None:
+        _, product = self._entries.pop(product_id)
+        if self._skus.get(product.sku) == product_id:
+            del self._skus[product.sku]
+
+    def _lookup(self, product_id: Optional[int]) -> Optional[Product]:
+        entry = self._entries.get(product_id) if product_id is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, product = entry
+        if self.ttl_seconds and expires_at <= time.monotonic():
+            self._remove(product_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(product_id)
+        self.hits += 1
+        return product
+
+    def get(self, product_id: int) -> Optional[Product]:
+        with self._lock:
+            return self._lookup(product_id)
+
+    def get_by_sku(self, sku: str) -> Optional[Product]:
+        with self._lock:
+            return self._lookup(self._skus.get(sku))
+
+    def put(self, product: Any) -> Product:
+        """Cache an ORM product (its category is loaded if needed) or a schema."""
+        if not isinstance(product, Product):
+            product = Product.model_validate(product)
+        if self.max_entries <= 0:
+            return product
+        with self._lock:
+            if product.id in self._entries:
+                self._remove(product.id)
+            self._entries[product.id] = (time.monotonic() + self.ttl_seconds, product)
+            self._skus[product.sku] = product.id
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return product
+
+    def invalidate(self, product_id: int) -> None:
+        with self._lock:
+            if product_id in self._entries:
+                self._remove(product_id)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._skus.clear()
+
+    def warm(self, db: Session) -> int:
+        """Load up to max_entries products, lowest ids first."""
+        products = (
+            db.query(ProductModel)
+            .options(joinedload(ProductModel.category))
+            .order_by(ProductModel.id)
+            .limit(self.max_entries)
+            .all()
+        )
+        for product in products:
+            self.put(product)
+        return len(products)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+product_cache = ProductCache(PRODUCT_CACHE_MAX_ENTRIES, PRODUCT_CACHE_TTL_SECONDS)
+
+
+def get_product_cache() -> ProductCache:
+    return product_cache
+
+
+def get_product(db: Session, product_id: int) -> Optional[Product]:
+    """
+    The product with `product_id` from the cache, loading it on a miss. Only
+    rows read from the primary are cached: a lagging replica could put back a
+    product that was just updated or deleted.
+    """
+    product = product_cache.get(product_id)
+    if product is not None:
+        return product
+    db_product = (
+        db.query(ProductModel)
+        .options(joinedload(ProductModel.category))
+        .filter(ProductModel.id == product_id)
+        .first()
+    )
+    if db_product is None:
+        return None
+    if is_replica_session(db):
+        return Product.model_validate(db_product)
+    return product_cache.put(db_product)
+
+
+def is_sku_conflict(error: IntegrityError) -> bool:
+    """Whether an IntegrityError comes from the unique SKU index."""
+    diag = getattr(error.orig, "diag", None)
+    return getattr(diag, "constraint_name", None) == SKU_CONSTRAINT
+
+
+def is_missing_product(error: IntegrityError) -> bool:
+    """
+    Whether an IntegrityError is a foreign key violation, i.e. a cached product
+    was deleted by another process before the write referencing it.
+    """
+    return getattr(error.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION
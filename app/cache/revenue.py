@@ -0,0 +1,96 @@
+import os
+import functools
+import inspect
+from typing import Any, Callable, Dict, List
+from dotenv import load_dotenv
+from app.cache.base import CacheBackend, DateRange, InMemoryCache, NullCache
+from app.db.database import read_staleness
+
+load_dotenv()
+
+REVENUE_CACHE_BACKEND = os.getenv("REVENUE_CACHE_BACKEND", "memory")
+REVENUE_CACHE_TTL_SECONDS = float(os.getenv("REVENUE_CACHE_TTL_SECONDS", "300"))
+REVENUE_CACHE_MAX_ENTRIES = int(os.getenv("REVENUE_CACHE_MAX_ENTRIES", "1024"))
+
+
+def _build_cache() -> CacheBackend:
+    if REVENUE_CACHE_BACKEND == "none":
+        return NullCache()
+    if REVENUE_CACHE_BACKEND == "memory":
+        return InMemoryCache(
+            max_entries=REVENUE_CACHE_MAX_ENTRIES,
+            ttl_seconds=REVENUE_CACHE_TTL_SECONDS,
+        )
+    raise ValueError(f"Unknown REVENUE_CACHE_BACKEND: {REVENUE_CACHE_BACKEND}")
+
+
+revenue_cache: CacheBackend = _build_cache()
+
+
+def get_revenue_cache() -> CacheBackend:
+    return revenue_cache
+
+
+def set_revenue_cache(backend: CacheBackend) -> None:
+    """Swap in another backend, e.g. a shared cache in multi-worker deployments."""
+    global revenue_cache
+    revenue_cache = backend
+
+
+def cached_revenue(endpoint: str, ranges: Callable[[Dict[str, Any]], List[DateRange]]):
+    """
+    Cache a revenue route handler's result keyed on its non-session parameters.
+
+    `ranges` maps those parameters to the date ranges the result depends on,
+    which is what sale writes invalidate against. A result computed on a
+    replica is only stored when none of its days were invalidated within the
+    replica's staleness bound, so a lagging replica cannot cache totals from
+    before an invalidation.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(**kwargs):
+                params = {k: v for k, v in kwargs.items() if k != "db"}
+                return await get_revenue_cache().aget_or_compute(
+                    endpoint,
+                    params,
+                    ranges(params),
+                    lambda: func(**kwargs),
+                    staleness=read_staleness(kwargs.get("db")),
+                )
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            params = {key: value for key, value in kwargs.items() if key != "db"}
+            return get_revenue_cache().get_or_compute(
+                endpoint,
+                params,
+                ranges(params),
+                lambda: func(**kwargs),
+                staleness=read_staleness(kwargs.get("db")),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def date_range_params(params: Dict[str, Any]) -> List[DateRange]:
+    return [(params["start_date"], params["end_date"])]
+
+
+def comparison_range_params(params: Dict[str, Any]) -> List[DateRange]:
+    comparison = params["comparison"]
+    return [
+        (comparison.period1_start, comparison.period1_end),
+        (comparison.period2_start, comparison.period2_end),
+    ]
+
+
+def period_comparison_range_params(params: Dict[str, Any]) -> List[DateRange]:
+    return [(period.start_date, period.end_date) for period in params["comparison"].periods]
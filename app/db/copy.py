@@ -0,0 +1,55 @@
+import io
+from typing import Any, Iterable, Sequence
+from sqlalchemy import Table, insert
+from sqlalchemy.orm import Session
+
+_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_TEXT_ESCAPES)
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    # Numbers, Decimals, dates and datetimes all render as valid COPY text
+    return str(value)
+
+
+def copy_rows(
+    db: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> int:
+    """
+    Load rows into `table` with COPY ... FROM STDIN on the session's connection.
+
+    Runs inside the session's current transaction. Drivers without COPY support
+    fall back to a multi-row INSERT through SQLAlchemy's insertmanyvalues.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    dbapi_connection = db.connection().connection.driver_connection
+    cursor = dbapi_connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        db.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+        return len(rows)
+
+    buffer = io.StringIO()
+    buffer.writelines(
+        "\t".join(_copy_value(value) for value in row) + "\n" for row in rows
+    )
+    buffer.seek(0)
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN",
+            buffer,
+        )
+    finally:
+        cursor.close()
+    return len(rows)
@@ -0,0 +1,81 @@
+import io
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Synthetic sales generation shared by the benchmark dataset generator and the
+# scaled demo data loader. Columns are built with NumPy from a caller-supplied
+# generator, so a fixed seed always produces the same rows, and frames are
+# loaded with COPY.
+
+PLATFORMS = np.array(["Amazon", "Walmart", "Company Website", "Retail Store"])
+PLATFORM_WEIGHTS = np.array([0.4, 0.25, 0.25, 0.1])
+# Every application table with generated rows, in truncation order
+TABLES = ["daily_revenue", "sales", "inventory_history", "inventory", "products", "categories"]
+
+
+def copy_frame(cursor, table, frame, float_format="%.2f"):
+    buffer = io.StringIO()
+    frame.to_csv(buffer, sep="\t", header=False, index=False, na_rep="\\N", float_format=float_format)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN", buffer)
+
+
+def popularity(rng, count, skew):
+    """Power-law weights over products in a random order (skew 0 is uniform)."""
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def day_weights(start_date: date, days, seasonality=0.6, growth=0.0):
+    """
+    Relative sales volume per day: a yearly cycle peaking in mid December with
+    the given amplitude, compounded by `growth` per year.
+    """
+    day_of_year = (np.arange(days) + start_date.timetuple().tm_yday) % 365
+    weights = 1.0 + seasonality * np.cos(2 * np.pi * (day_of_year - 345) / 365)
+    weights *= (1.0 + growth) ** (np.arange(days) / 365)
+    return weights / weights.sum()
+
+
+def draw(rng, cdf, size):
+    """Indexes sampled from a cumulative weight array."""
+    # Inverse-CDF sampling; much cheaper than rng.choice(p=...) per chunk
+    return np.minimum(np.searchsorted(cdf, rng.random(size) * cdf[-1]), len(cdf) - 1)
+
+
+def sales_frame(rng, first_id, size, prices, product_cdf, date_cdf, start_date: date, customers):
+    """
+    `size` sales with ids from `first_id`. Products and days are drawn from the
+    cumulative weights (see popularity and day_weights); product ids index
+    `prices` from 1.
+    """
+    product_ids = draw(rng, product_cdf, size) + 1
+    quantity = rng.integers(1, 6, size)
+    unit_price = prices[product_ids - 1]
+    ids = np.arange(first_id, first_id + size)
+    sales_date = np.datetime64(start_date, "D") + draw(rng, date_cdf, size)
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "order_id": pd.Series(ids).map("ORD-{:09d}".format),
+            "product_id": product_ids,
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "total_price": np.round(unit_price * quantity, 2),
+            "customer_id": pd.Series(rng.integers(1, customers + 1, size)).map("CUST-{:07d}".format),
+            "sales_date": sales_date.astype(str),
+            "platform": PLATFORMS[rng.choice(len(PLATFORMS), size, p=PLATFORM_WEIGHTS)],
+        }
+    )
+
+
+def reset_sequences(cursor):
+    """Move every id sequence past the ids loaded explicitly."""
+    for table in TABLES:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+        )
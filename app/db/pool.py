@@ -0,0 +1,113 @@
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.metrics import registry
+
+# Instrumented pools: the checkout wait is timed around QueuePool._do_get so it
+# includes time spent blocked on an exhausted pool, while hold time is measured
+# from the checkout/checkin pool events.
+
+_pools = weakref.WeakValueDictionary()
+
+checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+)
+connection_hold = registry.histogram(
+    "db_pool_connection_hold_seconds",
+    "Time a connection stayed checked out before being returned",
+)
+checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout seconds",
+)
+connections_created = registry.counter(
+    "db_pool_connections_created_total",
+    "New DBAPI connections opened by the pool",
+)
+connections_invalidated = registry.counter(
+    "db_pool_connections_invalidated_total",
+    "Connections discarded after an error or failed pre-ping",
+)
+
+
+def _collect(read):
+    def collect():
+        return [({"pool": name}, read(pool)) for name, pool in list(_pools.items())]
+
+    return collect
+
+
+registry.gauge("db_pool_size", "Configured pool_size", _collect(lambda p: p.size()))
+registry.gauge(
+    "db_pool_checked_out", "Connections currently checked out", _collect(lambda p: p.checkedout())
+)
+registry.gauge(
+    "db_pool_checked_in", "Idle connections held by the pool", _collect(lambda p: p.checkedin())
+)
+registry.gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative while the pool is not yet full)",
+    _collect(lambda p: p.overflow()),
+)
+
+
+class _InstrumentedPoolMixin:
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            checkout_timeouts.inc(pool=self.metrics_name)
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - started, pool=self.metrics_name)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting under the same name
+        # (event listeners travel with the copied dispatch)
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        _pools[self.metrics_name] = pool
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def track_pool(pool, name):
+    """Register a pool under ``name`` and attach the lifecycle listeners."""
+    pool.metrics_name = name
+    _pools[name] = pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connections_created.inc(pool=name)
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            connection_hold.observe(time.perf_counter() - started, pool=name)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        connections_invalidated.inc(pool=name)
+
+    return pool
+
@@ -0,0 +1,133 @@
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional, Sequence
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.pool import InstrumentedQueuePool, track_pool
+from app.metrics import registry
+
+# Read replicas for read-only endpoints. Replicas are picked round robin among
+# the healthy ones; a replica is healthy when it answers and its replay lag is
+# within the limit. Health is re-checked lazily at most every `check_interval`
+# seconds per replica, and a replica is marked down as soon as a connection to
+# it fails. With no healthy replica, reads fall back to the primary.
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received; NULL on a primary.
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        # Set in DB_ASYNC_MODE; health is still checked through `engine`
+        self.async_engine = None
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self._checking = threading.Lock()
+
+    def mark(self, healthy: bool, reason: str = "") -> None:
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("Replica %s is healthy again", self.name)
+            else:
+                logger.warning("Replica %s marked unhealthy: %s", self.name, reason)
+        self.healthy = healthy
+
+    def check(self, max_lag: float) -> bool:
+        # Only one thread probes a replica at a time; the others use the last result
+        if not self._checking.acquire(blocking=False):
+            return self.healthy
+        try:
+            with self.engine.connect() as connection:
+                lag = connection.execute(LAG_QUERY).scalar()
+            self.lag = float(lag or 0)
+            if self.lag > max_lag:
+                self.mark(False, f"replay lag {self.lag:.1f}s")
+            else:
+                self.mark(True)
+        except SQLAlchemyError as e:
+            self.mark(False, str(e).splitlines()[0])
+        finally:
+            self.checked_at = time.monotonic()
+            self._checking.release()
+        return self.healthy
+
+
+class ReplicaSet:
+    def __init__(
+        self,
+        urls: Sequence[str],
+        pool_options: dict,
+        check_interval: float = 5.0,
+        max_lag: float = 10.0,
+        connect_timeout: int = 2,
+    ):
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.replicas: List[Replica] = []
+        for index, url in enumerate(urls):
+            engine = create_engine(
+                url,
+                poolclass=InstrumentedQueuePool,
+                connect_args={"connect_timeout": connect_timeout},
+                **pool_options,
+            )
+            replica = Replica(f"replica{index}", engine)
+            track_pool(engine.pool, replica.name)
+            watch_errors(replica, engine)
+            self.replicas.append(replica)
+        self._next = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[Replica]:
+        """The next healthy replica in round-robin order, or None for the primary."""
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        now = time.monotonic()
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if now - replica.checked_at >= self.check_interval:
+                replica.check(self.max_lag)
+            if replica.healthy:
+                return replica
+        return None
+
+    def status(self) -> List[dict]:
+        return [
+            {"name": replica.name, "healthy": replica.healthy, "lag_seconds": replica.lag}
+            for replica in self.replicas
+        ]
+
+
+def watch_errors(replica: Replica, engine: Engine) -> None:
+    @event.listens_for(engine, "handle_error")
+    def on_error(context):
+        # Connection failures take the replica out of rotation until the next check
+        if context.is_disconnect or context.connection is None:
+            replica.mark(False, str(context.original_exception).splitlines()[0])
+            replica.checked_at = time.monotonic()
+
+
+def parse_urls(value: str) -> List[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def track_replicas(replicas: ReplicaSet) -> None:
+    registry.gauge(
+        "db_replica_healthy",
+        "1 when the replica is in the read rotation",
+        lambda: [({"replica": r.name}, 1.0 if r.healthy else 0.0) for r in replicas.replicas],
+    )
@@ -0,0 +1,234 @@
+import asyncio
+import functools
+import logging
+import os
+import re
+import time
+from collections import Counter as ShapeCounter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import registry
+
+# Per-request SQL instrumentation. The middleware opens a RequestStats for each
+# HTTP request, SQLAlchemy cursor events add statement counts and DB time to
+# it, and InstrumentedRoute splits handler time into the endpoint itself and
+# the rest (response validation and serialization). Results are returned as a
+# Server-Timing header and recorded as metrics labelled by route template.
+
+logger = logging.getLogger(__name__)
+
+REQUEST_INSTRUMENTATION = os.getenv("REQUEST_INSTRUMENTATION", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Warn when one request runs the same statement shape at least this many
+# times (0 disables the check)
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "Total time to produce the response, by route"
+)
+request_db_time = registry.histogram(
+    "http_request_db_seconds", "Time spent executing SQL statements, by route"
+)
+request_serialization_time = registry.histogram(
+    "http_request_serialization_seconds",
+    "Time spent validating and serializing the endpoint result, by route",
+)
+request_statements = registry.histogram(
+    "http_request_sql_statements", "SQL statements issued per request, by route", STATEMENT_BUCKETS
+)
+n_plus_one_warnings = registry.counter(
+    "sql_n_plus_one_total", "Requests that repeated one statement shape past the threshold"
+)
+
+_EXPANDED_IN = re.compile(r"IN \((?:__\[POSTCOMPILE_\w+\]|%\(\w+\)s(?:, %\(\w+\)s)*)\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize statement text so repeated lookups with different IN-list sizes match."""
+    return _EXPANDED_IN.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestStats:
+    __slots__ = (
+        "started",
+        "route",
+        "method",
+        "statements",
+        "db_time",
+        "endpoint_time",
+        "handler_time",
+        "shapes",
+    )
+
+    def __init__(self, method: str):
+        self.started = time.perf_counter()
+        self.route: Optional[str] = None
+        self.method = method
+        self.statements = 0
+        self.db_time = 0.0
+        self.endpoint_time = 0.0
+        self.handler_time = 0.0
+        self.shapes = ShapeCounter()
+
+    @property
+    def serialization_time(self) -> float:
+        return max(self.handler_time - self.endpoint_time, 0.0)
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} queries"',
+                f"app;dur={self.endpoint_time * 1000:.2f}",
+                f"serialize;dur={self.serialization_time * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("request_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("request_query_started")
+    if started:
+        stats.db_time += time.perf_counter() - started.pop()
+    stats.statements += 1
+    stats.shapes[statement] += 1
+
+
+def _timed_endpoint(call):
+    """Wrap an endpoint, preserving sync/async-ness, to time the call itself."""
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                stats = _current_stats.get()
+                if stats is not None:
+                    stats.endpoint_time += time.perf_counter() - started
+
+        return async_wrapper
+
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.endpoint_time += time.perf_counter() - started
+
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that records its path template and endpoint/handler timings on the
+    current RequestStats. Use as ``APIRouter(route_class=InstrumentedRoute)``.
+    """
+
+    def get_route_handler(self):
+        self.dependant.call = _timed_endpoint(self.dependant.call)
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def instrumented_handler(request):
+            stats = _current_stats.get()
+            if stats is None:
+                return await handler(request)
+            stats.route = path
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                stats.handler_time += time.perf_counter() - started
+
+        return instrumented_handler
+
+
+def _record(stats: RequestStats) -> None:
+    if stats.route is None:
+        # Unmatched paths (404s, docs, static) would only add label cardinality
+        return
+    labels = {"route": stats.route, "method": stats.method}
+    request_duration.observe(time.perf_counter() - stats.started, **labels)
+    request_db_time.observe(stats.db_time, **labels)
+    request_serialization_time.observe(stats.serialization_time, **labels)
+    request_statements.observe(stats.statements, **labels)
+
+    if SQL_N_PLUS_ONE_THRESHOLD <= 0 or not stats.shapes:
+        return
+    shapes = ShapeCounter()
+    for statement, count in stats.shapes.items():
+        shapes[statement_shape(statement)] += count
+    repeated = [(shape, count) for shape, count in shapes.items() if count >= SQL_N_PLUS_ONE_THRESHOLD]
+    if repeated:
+        n_plus_one_warnings.inc(**labels)
+        for shape, count in repeated:
+            logger.warning(
+                "Possible N+1 on %s %s: statement ran %d times in one request: %s",
+                stats.method,
+                stats.route,
+                count,
+                shape[:300],
+            )
+
+
+class RequestInstrumentationMiddleware:
+    """Pure ASGI middleware so streaming responses are not buffered."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"])
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            _record(stats)
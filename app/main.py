@@ -1,11 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import products, inventory, sales, categories
+from app.api import products, inventory, sales, categories, internal, jobs
+from app.api.etags import ETAG_HEADER
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.cache.products import PRODUCT_CACHE_WARM, get_product_cache
+from app.db.database import DB_ASYNC_MODE, SessionLocal
+from app.services.jobs import JOBS_ENABLED, start_job_runner, stop_job_runner
+from app.services.sales_snapshot import SALES_SNAPSHOT, load_sales_snapshot
+from app.instrumentation import (
+    REQUEST_INSTRUMENTATION,
+    InstrumentedRoute,
+    RequestInstrumentationMiddleware,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if PRODUCT_CACHE_WARM:
+        with SessionLocal() as db:
+            get_product_cache().warm(db)
+    if SALES_SNAPSHOT:
+        with SessionLocal() as db:
+            load_sales_snapshot(db)
+    if JOBS_ENABLED:
+        with SessionLocal() as db:
+            start_job_runner(db)
+    yield
+    stop_job_runner()
+
 
 app = FastAPI(
     title="E-Commerce Admin Dashboard API",
     description="API for e-commerce admin dashboard with sales analytics and inventory management",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -14,15 +43,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, "Server-Timing"],
 )
 
+if REQUEST_INSTRUMENTATION:
+    app.add_middleware(RequestInstrumentationMiddleware)
+
 app.include_router(products.router, prefix="/api/products", tags=["Products"])
 
 app.include_router(categories.router, prefix="/api/categories", tags=["Categories"])
 
 app.include_router(inventory.router, prefix="/api/inventory", tags=["Inventory"])
 
-app.include_router(sales.router, prefix="/api/sales", tags=["Sales"])
+sales_router = sales.router
+if DB_ASYNC_MODE:
+    from app.api import async_sales
+
+    # Async analytics handlers replace their sync counterparts; everything
+    # else, including all sale writes, stays on the sync router.
+    app.include_router(async_sales.router, prefix="/api/sales", tags=["Sales"])
+    replaced = {
+        (route.path, frozenset(route.methods)) for route in async_sales.router.routes
+    }
+    sales_router = APIRouter(route_class=InstrumentedRoute)
+    sales_router.routes = [
+        route
+        for route in sales.router.routes
+        if (route.path, frozenset(route.methods)) not in replaced
+    ]
+
+app.include_router(sales_router, prefix="/api/sales", tags=["Sales"])
+
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+
+app.include_router(internal.router, prefix="/internal", tags=["Internal"])
 
 
 @app.get("/", tags=["Root"])
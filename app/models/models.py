@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, Date, DECIMAL, TIMESTAMP, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, Date, DECIMAL, TIMESTAMP, Index, func
+from sqlalchemy import BigInteger, DDL, Computed, Float, cast, event, literal_column
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.db.database import Base
 
 class Category(Base):
@@ -26,12 +28,29 @@ class Product(Base):
     is_active = Column(Boolean, nullable=False, default=True)
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
+    # Maintained by Postgres; only product search reads it
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', name), 'A') || "
+        "setweight(to_tsvector('simple', sku), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+        persisted=True,
+    )))
 
     category = relationship("Category", back_populates="products")
     inventory = relationship("Inventory", back_populates="product", uselist=False)
     inventory_history = relationship("InventoryHistory", back_populates="product")
     sales = relationship("Sale", back_populates="product")
 
+    __table_args__ = (
+        # Product search: words and prefixes through the tsvector, name and SKU
+        # fragments through trigrams
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_products_sku_trgm", "sku", postgresql_using="gin", postgresql_ops={"sku": "gin_trgm_ops"}),
+    )
+
+event.listen(Product.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 class Inventory(Base):
     __tablename__ = "inventory"
 
@@ -44,19 +63,49 @@ class Inventory(Base):
 
     product = relationship("Product", back_populates="inventory")
 
+# Stock on hand relative to the low-stock threshold; <= 1 means low stock.
+# Queries must use this exact expression to be served by the indexes below.
+inventory_stock_ratio = cast(Inventory.quantity, Float) / cast(
+    func.greatest(Inventory.low_stock_threshold, literal_column("1")), Float
+)
+Index("ix_inventory_stock_ratio_id", inventory_stock_ratio, Inventory.id)
+# Low stock is usually a small slice of the table, so low-stock views read a
+# partial index instead of scanning every row
+Index(
+    "ix_inventory_low_stock",
+    inventory_stock_ratio,
+    Inventory.id,
+    postgresql_where=Inventory.quantity <= Inventory.low_stock_threshold,
+)
+
 class InventoryHistory(Base):
     __tablename__ = "inventory_history"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity_change = Column(Integer, nullable=False)
     new_quantity = Column(Integer, nullable=False)
     change_reason = Column(String(100), nullable=False)
-    change_timestamp = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    # Part of the primary key because the table is range-partitioned on it
+    change_timestamp = Column(TIMESTAMP, primary_key=True, nullable=False, server_default=func.now())
     changed_by = Column(String(100), nullable=False)
 
     product = relationship("Product", back_populates="inventory_history")
 
+    __table_args__ = (
+        # Matches the history endpoint: one product, newest first
+        Index("ix_inventory_history_product_timestamp", "product_id", "change_timestamp", "id"),
+        # Monthly partitions are managed by app.services.history_partitions
+        {"postgresql_partition_by": "RANGE (change_timestamp)"},
+    )
+
+# Rows outside every monthly partition land here until maintenance moves them
+event.listen(
+    InventoryHistory.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS inventory_history_default PARTITION OF inventory_history DEFAULT"),
+)
+
 class Sale(Base):
     __tablename__ = "sales"
 
@@ -71,4 +120,97 @@ class Sale(Base):
     platform = Column(String(50))
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
-    product = relationship("Product", back_populates="sales") 
\ No newline at end of file
+    product = relationship("Product", back_populates="sales")
+
+    __table_args__ = (
+        # Keyset pagination walks sales in (sales_date, id) order
+        Index("ix_sales_sales_date_id", "sales_date", "id"),
+    )
+
+
+class DailyRevenue(Base):
+    __tablename__ = "daily_revenue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sales_date = Column(Date, nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    category_id = Column(Integer, index=True)
+    platform = Column(String(50))
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+    sale_count = Column(Integer, nullable=False, default=0)
+
+    product = relationship("Product")
+
+# Date-range scans grouped by product, category or platform (top sellers) can
+# be answered from this index alone.
+Index(
+    "ix_daily_revenue_date_product",
+    DailyRevenue.sales_date,
+    DailyRevenue.product_id,
+    postgresql_include=["category_id", "platform", "revenue", "units", "sale_count"],
+)
+
+# One rollup row per (date, product, platform); NULL platforms share a bucket.
+Index(
+    "uq_daily_revenue_key",
+    DailyRevenue.sales_date,
+    DailyRevenue.product_id,
+    func.coalesce(DailyRevenue.platform, ""),
+    unique=True,
+)
+
+class Job(Base):
+    """A background job; see app.services.jobs."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")
+    params = Column(JSONB, nullable=False)
+    progress = Column(Float, nullable=False, default=0.0)
+    result = Column(JSONB)
+    # File written by the job, served by GET /api/jobs/{id}/result
+    result_path = Column(String(500))
+    error = Column(Text)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
+    started_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+    updated_at = Column(TIMESTAMP, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Queue depth checks and status-filtered listings
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+class TableVersion(Base):
+    """Change counter per table, bumped by a statement trigger on every write."""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False)
+
+# Tables whose reads are served with ETags (see app.api.etags)
+VERSIONED_TABLES = ("categories", "products", "inventory")
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE SEQUENCE IF NOT EXISTS table_versions_seq;"
+        "CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$ "
+        "BEGIN "
+        "INSERT INTO table_versions (table_name, version) "
+        "VALUES (TG_TABLE_NAME, nextval('table_versions_seq')) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = excluded.version; "
+        "RETURN NULL; "
+        "END $$ LANGUAGE plpgsql;"
+        + "".join(
+            f"DROP TRIGGER IF EXISTS {table}_version ON {table};"
+            f"CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();"
+            for table in VERSIONED_TABLES
+        )
+    ),
+)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -55,10 +55,12 @@ class Product(ProductBase):
 
 # Inventory Schemas
 class InventoryBase(BaseModel):
-    quantity: int = Field(..., ge=0)
+    # Stock can go negative through backordered sales (SALES_DECREMENT_STOCK)
+    quantity: int
     low_stock_threshold: int = Field(..., ge=0)
 
 class InventoryCreate(InventoryBase):
+    quantity: int = Field(..., ge=0)
     product_id: int
 
 class InventoryUpdate(BaseModel):
@@ -76,6 +78,32 @@ class Inventory(InventoryBase):
         from_attributes = True
 
 # Inventory History Schemas
+class InventoryAdjustment(BaseModel):
+    product_id: int
+    delta: Optional[int] = None
+    quantity: Optional[int] = Field(None, ge=0)
+    change_reason: Optional[str] = None
+
+    @validator('quantity', always=True)
+    def exactly_one_of_delta_or_quantity(cls, v, values):
+        if (v is None) == (values.get('delta') is None):
+            raise ValueError('give exactly one of delta or quantity')
+        return v
+
+class InventoryAdjustmentBatch(BaseModel):
+    adjustments: List[InventoryAdjustment] = Field(..., min_length=1, max_length=10000)
+    changed_by: str
+    change_reason: str
+
+class InventoryAdjustmentResult(BaseModel):
+    product_id: int
+    previous_quantity: int
+    new_quantity: int
+
+class InventoryAdjustmentResponse(BaseModel):
+    adjusted: int
+    results: List[InventoryAdjustmentResult]
+
 class InventoryHistoryBase(BaseModel):
     product_id: int
     quantity_change: int
@@ -151,6 +179,25 @@ class RevenueComparison(BaseModel):
             raise ValueError('period2_end must be after period2_start')
         return v
 
+class RevenuePeriod(BaseModel):
+    start_date: date
+    end_date: date
+    label: Optional[str] = None
+
+    @validator('end_date')
+    def end_date_must_be_after_start_date(cls, v, values):
+        if 'start_date' in values and v < values['start_date']:
+            raise ValueError('end_date must be after start_date')
+        return v
+
+class PeriodComparison(BaseModel):
+    periods: List[RevenuePeriod] = Field(..., min_length=1, max_length=60)
+    breakdown: Optional[str] = Field(None, pattern="^(category|platform|product)$")
+    category_id: Optional[int] = None
+    platform: Optional[str] = None
+    product_id: Optional[int] = None
+    limit: Optional[int] = Field(None, gt=0, description="Keep the top groups by revenue in the last period")
+
 # Response Models
 class RevenueData(BaseModel):
     date: date
@@ -160,17 +207,116 @@ class RevenueResponse(BaseModel):
     data: List[RevenueData]
     total_revenue: Decimal
 
+class RevenueSeries(BaseModel):
+    granularity: str
+    category_id: Optional[int] = None
+    platform: Optional[str] = None
+    data: List[RevenueData]
+    total_revenue: Decimal
+
+class RevenueSeriesResponse(BaseModel):
+    series: List[RevenueSeries]
+
 class RevenueComparisonResponse(BaseModel):
     period1: Dict[str, Any]
     period2: Dict[str, Any]
     percentage_change: Decimal
 
+class PeriodRevenue(BaseModel):
+    label: Optional[str] = None
+    start_date: date
+    end_date: date
+    days: int
+    revenue: Decimal
+    units: int
+    daily_avg: Decimal
+    change: Optional[Decimal] = None
+    percentage_change: Optional[Decimal] = None
+
+class PeriodComparisonGroup(BaseModel):
+    key: Union[int, str, None]
+    periods: List[PeriodRevenue]
+
+class PeriodComparisonResponse(BaseModel):
+    breakdown: Optional[str] = None
+    totals: List[PeriodRevenue]
+    groups: List[PeriodComparisonGroup]
+
+class TopSeller(BaseModel):
+    rank: int
+    key: Union[int, str, None] = None
+    name: Optional[str] = None
+    sku: Optional[str] = None
+    revenue: Decimal
+    units: int
+    sale_count: int
+    revenue_share: Decimal
+
+class TopSellersResponse(BaseModel):
+    group_by: str
+    metric: str
+    start_date: date
+    end_date: date
+    total_revenue: Decimal
+    total_units: int
+    items: List[TopSeller]
+
 class InventoryStatus(BaseModel):
     product: Product
     quantity: int
     low_stock_threshold: int
     is_low_stock: bool
+    stock_ratio: Optional[float] = None
 
 class LowStockResponse(BaseModel):
     low_stock_items: List[InventoryStatus]
-    total_count: int 
\ No newline at end of file
+    total_count: int
+
+
+class BulkSaleError(BaseModel):
+    row: int
+    detail: str
+
+class BulkSaleResponse(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkSaleError]
+    # Products left with negative stock when SALES_DECREMENT_STOCK=backorder
+    backordered: List[int] = []
+
+# Background jobs
+class JobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    progress: float
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RollupRebuildJob(BaseModel):
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+class SalesExportJob(BaseModel):
+    start_date: date
+    end_date: date
+    product_id: Optional[int] = None
+    category_id: Optional[int] = None
+    platform: Optional[str] = None
+    format: str = Field("csv", pattern="^(csv|ndjson)$")
+
+class HistoryCompactionJob(BaseModel):
+    before: date = Field(..., description="Compact months that ended on or before this date")
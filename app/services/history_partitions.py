@@ -0,0 +1,156 @@
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Maintenance for the monthly partitions of inventory_history: creating
+# partitions ahead of time and compacting old months into one row per product
+# per day. Partitions are named inventory_history_yYYYYmMM and cover
+# [first day of month, first day of next month).
+
+PARENT = "inventory_history"
+DEFAULT_PARTITION = "inventory_history_default"
+COLUMNS = (
+    "id",
+    "product_id",
+    "quantity_change",
+    "new_quantity",
+    "change_reason",
+    "change_timestamp",
+    "changed_by",
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+
+def monthly_partitions(db: Session) -> List[Tuple[str, date]]:
+    """Existing monthly partitions as (name, first day of month), oldest first."""
+    names = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": PARENT},
+    ).scalars()
+    result = []
+    prefix = f"{PARENT}_y"
+    for name in names:
+        if name.startswith(prefix):
+            year, month = name[len(prefix):].split("m")
+            result.append((name, date(int(year), int(month), 1)))
+    return sorted(result, key=lambda item: item[1])
+
+
+def _swap_in(db: Session, staging: str, name: str, month: date) -> None:
+    db.execute(text(f"ALTER TABLE {staging} RENAME TO {name}"))
+    db.execute(
+        text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+    )
+
+
+def create_partition(db: Session, month: date) -> str:
+    """
+    Create the partition for `month`, moving any rows for that month out of
+    the default partition first (Postgres refuses to attach over them).
+    """
+    name = partition_name(month)
+    staging = f"{name}_new"
+    columns = ", ".join(COLUMNS)
+    db.execute(
+        text(f"CREATE TABLE {staging} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    )
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE change_timestamp >= :start AND change_timestamp < :end "
+            f"RETURNING {columns}) "
+            f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM moved"
+        ),
+        {"start": month, "end": add_months(month, 1)},
+    )
+    _swap_in(db, staging, name, month)
+    return name
+
+
+def ensure_partitions(
+    db: Session, months_ahead: int = 3, start: Optional[date] = None
+) -> List[str]:
+    """Create any missing monthly partitions from `start` (default: this month) onwards."""
+    existing = {month for _, month in monthly_partitions(db)}
+    month = month_start(start or date.today())
+    last = add_months(month_start(date.today()), months_ahead)
+    created = []
+    while month <= last:
+        if month not in existing:
+            created.append(create_partition(db, month))
+        month = add_months(month, 1)
+    return created
+
+
+def compact_partition(db: Session, name: str, month: date) -> Tuple[int, int]:
+    """
+    Collapse a month into one net-change row per product per day.
+
+    The compacted rows are built in a fresh table which then replaces the
+    partition (detach, drop, rename, attach), so the old rows are dropped
+    wholesale instead of being deleted and vacuumed. Days with a single change
+    keep it as is, which makes compaction safe to repeat. Returns the row
+    counts before and after.
+    """
+    before = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+    staging = f"{name}_compacted"
+    db.execute(
+        text(f"CREATE TABLE {staging} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    )
+    db.execute(
+        text(
+            f"""
+            INSERT INTO {staging} ({", ".join(COLUMNS)})
+            SELECT
+                min(id),
+                product_id,
+                sum(quantity_change),
+                (array_agg(new_quantity ORDER BY change_timestamp DESC, id DESC))[1],
+                CASE WHEN count(*) = 1 THEN min(change_reason)
+                     ELSE 'Daily net change (' || count(*) || ' changes)' END,
+                max(change_timestamp),
+                CASE WHEN count(*) = 1 THEN min(changed_by) ELSE 'compaction' END
+            FROM {name}
+            GROUP BY product_id, change_timestamp::date
+            """
+        )
+    )
+    after = db.execute(text(f"SELECT count(*) FROM {staging}")).scalar()
+    if after == before:
+        db.execute(text(f"DROP TABLE {staging}"))
+        return before, after
+
+    db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+    _swap_in(db, staging, name, month)
+    return before, after
+
+
+def compact_history(db: Session, before: date) -> List[Tuple[str, int, int]]:
+    """Compact every monthly partition that ends on or before `before`."""
+    results = []
+    for name, month in monthly_partitions(db):
+        if add_months(month, 1) <= before:
+            results.append((name, *compact_partition(db, name, month)))
+    return results
@@ -0,0 +1,277 @@
+import os
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import Integer, String, bindparam, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from app.models.models import Inventory, InventoryHistory
+from app.schemas.schemas import (
+    InventoryAdjustmentBatch,
+    InventoryAdjustmentResponse,
+    InventoryAdjustmentResult,
+)
+
+# What recording a sale does to stock: "off" leaves inventory alone, "reject"
+# refuses sales that exceed the stock on hand, "backorder" accepts them and
+# lets the quantity go negative.
+SALES_DECREMENT_STOCK = os.getenv("SALES_DECREMENT_STOCK", "off").lower()
+if SALES_DECREMENT_STOCK not in ("off", "reject", "backorder"):
+    raise ValueError(f"Unknown SALES_DECREMENT_STOCK: {SALES_DECREMENT_STOCK}")
+
+SALE_CHANGE_REASON = "Sale"
+BACKORDER_CHANGE_REASON = "Sale (backorder)"
+SALE_CHANGED_BY = "sales"
+
+
+class MissingInventory(LookupError):
+    def __init__(self, product_ids: List[int]):
+        super().__init__(f"Inventory not found for products: {product_ids}")
+        self.product_ids = product_ids
+
+
+class NegativeStock(ValueError):
+    def __init__(self, product_ids: List[int]):
+        super().__init__(f"Adjustment would make stock negative for products: {product_ids}")
+        self.product_ids = product_ids
+
+
+def _unnest(*arrays):
+    """unnest() over parallel array parameters, exposed as named columns."""
+    params = [
+        bindparam(name, values, type_=ARRAY(type_)) for name, type_, values in arrays
+    ]
+    return (
+        func.unnest(*params)
+        .table_valued(*(name for name, _, _ in arrays))
+        .render_derived()
+    )
+
+
+def apply_adjustments(
+    db: Session, batch: InventoryAdjustmentBatch
+) -> InventoryAdjustmentResponse:
+    """
+    Apply a batch of delta/absolute stock changes atomically.
+
+    Inventory rows are locked with SELECT ... FOR UPDATE in product_id order, so
+    concurrent batches touching the same products queue instead of deadlocking
+    or losing updates. Adjustments to the same product apply in request order.
+    Quantities and history rows are then written with one UPDATE and one
+    INSERT, each fed by unnest() over array parameters, so the statement count
+    does not grow with the batch.
+    """
+    product_ids = sorted({adjustment.product_id for adjustment in batch.adjustments})
+
+    rows = db.execute(
+        select(Inventory.id, Inventory.product_id, Inventory.quantity)
+        .where(Inventory.product_id.in_(product_ids))
+        .order_by(Inventory.product_id, Inventory.id)
+        .with_for_update()
+    ).all()
+    inventory_ids: Dict[int, int] = {}
+    previous: Dict[int, int] = {}
+    for row in rows:
+        # Keep the first row should a product have more than one
+        if row.product_id not in inventory_ids:
+            inventory_ids[row.product_id] = row.id
+            previous[row.product_id] = row.quantity
+
+    missing = [product_id for product_id in product_ids if product_id not in previous]
+    if missing:
+        raise MissingInventory(missing)
+
+    current = dict(previous)
+    history = []
+    negative = set()
+    for adjustment in batch.adjustments:
+        old_quantity = current[adjustment.product_id]
+        if adjustment.delta is not None:
+            new_quantity = old_quantity + adjustment.delta
+        else:
+            new_quantity = adjustment.quantity
+        if new_quantity == old_quantity:
+            continue
+        # Stock left negative by backordered sales may be restocked in steps;
+        # only adjustments that lower a quantity below zero are refused
+        if new_quantity < 0 and new_quantity < old_quantity:
+            negative.add(adjustment.product_id)
+        current[adjustment.product_id] = new_quantity
+        history.append(
+            (
+                adjustment.product_id,
+                new_quantity - old_quantity,
+                new_quantity,
+                adjustment.change_reason or batch.change_reason,
+            )
+        )
+
+    if negative:
+        raise NegativeStock(sorted(negative))
+
+    changed = [product_id for product_id in product_ids if current[product_id] != previous[product_id]]
+    if changed:
+        new_values = _unnest(
+            ("id", Integer, [inventory_ids[product_id] for product_id in changed]),
+            ("quantity", Integer, [current[product_id] for product_id in changed]),
+        )
+        db.execute(
+            update(Inventory.__table__)
+            .where(Inventory.__table__.c.id == new_values.c.id)
+            .values(quantity=new_values.c.quantity)
+        )
+
+    # Offsetting adjustments leave the quantity unchanged but are still history
+    if history:
+        entries = _unnest(
+            ("product_id", Integer, [entry[0] for entry in history]),
+            ("quantity_change", Integer, [entry[1] for entry in history]),
+            ("new_quantity", Integer, [entry[2] for entry in history]),
+            ("change_reason", String, [entry[3] for entry in history]),
+        )
+        db.execute(
+            insert(InventoryHistory.__table__).from_select(
+                ["product_id", "quantity_change", "new_quantity", "change_reason", "changed_by"],
+                select(
+                    entries.c.product_id,
+                    entries.c.quantity_change,
+                    entries.c.new_quantity,
+                    entries.c.change_reason,
+                    literal(batch.changed_by, String),
+                ),
+            )
+        )
+
+    db.commit()
+
+    return InventoryAdjustmentResponse(
+        adjusted=len(history),
+        results=[
+            InventoryAdjustmentResult(
+                product_id=product_id,
+                previous_quantity=previous[product_id],
+                new_quantity=current[product_id],
+            )
+            for product_id in product_ids
+        ],
+    )
+
+
+def decrement_stock(
+    db: Session, lines: Sequence[Tuple[int, int]], backorder: bool = False
+) -> Tuple[Dict[int, str], List[int]]:
+    """
+    Take sold units out of stock for (product_id, quantity) sale lines, without
+    committing, so the caller records the sales in the same transaction.
+
+    Lines are summed per product, so the whole batch costs one row-locking
+    SELECT, one conditional UPDATE ... RETURNING and one history INSERT, with
+    one history row per product. Without `backorder`, lines are accepted in
+    order while stock lasts and the rest are refused, as are products without
+    an inventory record. With it, every line is accepted, quantities may go
+    negative and a missing inventory record is created at minus the units sold.
+
+    Returns the reasons lines were refused, keyed by position in `lines`,
+    and the products left with negative stock.
+    """
+    product_ids = sorted({product_id for product_id, _ in lines})
+    rows = db.execute(
+        select(Inventory.id, Inventory.product_id, Inventory.quantity)
+        .where(Inventory.product_id.in_(product_ids))
+        .order_by(Inventory.product_id, Inventory.id)
+        .with_for_update()
+    ).all()
+    inventory_ids: Dict[int, int] = {}
+    available: Dict[int, int] = {}
+    for row in rows:
+        # Keep the first row should a product have more than one
+        if row.product_id not in inventory_ids:
+            inventory_ids[row.product_id] = row.id
+            available[row.product_id] = row.quantity
+
+    refused: Dict[int, str] = {}
+    units: Dict[int, int] = {}
+    for index, (product_id, quantity) in enumerate(lines):
+        if product_id not in available and not backorder:
+            refused[index] = "Inventory not found"
+        elif not backorder and units.get(product_id, 0) + quantity > available[product_id]:
+            refused[index] = "Insufficient stock"
+        else:
+            units[product_id] = units.get(product_id, 0) + quantity
+
+    if not units:
+        return refused, []
+
+    table = Inventory.__table__
+    stocked = [product_id for product_id in units if product_id in inventory_ids]
+    remaining: Dict[int, int] = {}
+    if stocked:
+        sold = _unnest(
+            ("id", Integer, [inventory_ids[product_id] for product_id in stocked]),
+            ("units", Integer, [units[product_id] for product_id in stocked]),
+        )
+        stmt = (
+            update(table)
+            .where(table.c.id == sold.c.id)
+            .values(quantity=table.c.quantity - sold.c.units)
+            .returning(table.c.product_id, table.c.quantity)
+        )
+        if not backorder:
+            stmt = stmt.where(table.c.quantity >= sold.c.units)
+        remaining.update(db.execute(stmt).all())
+
+    # Backordered products without an inventory record start below zero
+    unstocked = [product_id for product_id in units if product_id not in inventory_ids]
+    if unstocked:
+        created = _unnest(
+            ("product_id", Integer, unstocked),
+            ("quantity", Integer, [-units[product_id] for product_id in unstocked]),
+        )
+        remaining.update(
+            db.execute(
+                insert(table)
+                .from_select(
+                    ["product_id", "quantity", "low_stock_threshold"],
+                    select(
+                        created.c.product_id,
+                        created.c.quantity,
+                        literal(table.c.low_stock_threshold.default.arg, Integer),
+                    ),
+                )
+                .returning(table.c.product_id, table.c.quantity)
+            ).all()
+        )
+
+    # The rows are locked, so the UPDATE only skips rows it was never meant to
+    # touch; refuse the lines anyway should that ever change
+    for index, (product_id, _) in enumerate(lines):
+        if product_id in units and product_id not in remaining:
+            refused[index] = "Insufficient stock"
+    if not remaining:
+        return refused, []
+
+    entries = _unnest(
+        ("product_id", Integer, list(remaining)),
+        ("quantity_change", Integer, [-units[product_id] for product_id in remaining]),
+        ("new_quantity", Integer, list(remaining.values())),
+        (
+            "change_reason",
+            String,
+            [
+                BACKORDER_CHANGE_REASON if quantity < 0 else SALE_CHANGE_REASON
+                for quantity in remaining.values()
+            ],
+        ),
+    )
+    db.execute(
+        insert(InventoryHistory.__table__).from_select(
+            ["product_id", "quantity_change", "new_quantity", "change_reason", "changed_by"],
+            select(
+                entries.c.product_id,
+                entries.c.quantity_change,
+                entries.c.new_quantity,
+                entries.c.change_reason,
+                literal(SALE_CHANGED_BY, String),
+            ),
+        )
+    )
+    backordered = sorted(product_id for product_id, quantity in remaining.items() if quantity < 0)
+    return refused, backordered
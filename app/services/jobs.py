@@ -0,0 +1,403 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Type
+from pydantic import BaseModel
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.cache.revenue import get_revenue_cache
+from app.db.database import SessionLocal
+from app.models.models import Job
+from app.schemas.schemas import (
+    HistoryCompactionJob,
+    PeriodComparison,
+    RollupRebuildJob,
+    SalesExportJob,
+)
+from app.services import history_partitions, revenue_queries, revenue_rollup, sales_export
+from app.services.sales_snapshot import get_sales_snapshot
+
+# Background jobs for work too slow for a request: rollup rebuilds, exports,
+# history compaction and large comparisons. Jobs are rows in `jobs`; a bounded
+# thread pool in each API process runs the ones submitted to it. A worker
+# claims a job by moving it from queued to running, so a job runs at most
+# once even when several processes pick up the queue at startup. Progress is
+# written from short separate transactions, and that same write tells the job
+# whether cancellation was requested. Each pool also heartbeats the jobs it is
+# running, so a long job that reports little progress is not taken for lost.
+
+logger = logging.getLogger(__name__)
+
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "false").lower() in ("1", "true", "yes")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_LIMIT = int(os.getenv("JOB_QUEUE_LIMIT", "100"))
+JOB_RESULT_DIR = os.getenv("JOB_RESULT_DIR", "job_results")
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "900"))
+EXPORT_BATCH_SIZE = int(os.getenv("SALES_EXPORT_BATCH_SIZE", "5000"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Minimum seconds between progress writes of one job
+PROGRESS_INTERVAL = 0.5
+# Running jobs are touched this often, well within JOB_STALE_SECONDS
+HEARTBEAT_INTERVAL = JOB_STALE_SECONDS / 3
+
+
+class UnknownJobKind(ValueError):
+    def __init__(self, kind: str):
+        super().__init__(f"Unknown job kind: {kind}")
+        self.kind = kind
+
+
+class JobsDisabled(RuntimeError):
+    def __init__(self):
+        super().__init__("Background jobs are disabled (set JOBS_ENABLED=true)")
+
+
+class QueueFull(RuntimeError):
+    def __init__(self):
+        super().__init__(f"Too many queued jobs (limit {JOB_QUEUE_LIMIT})")
+
+
+class JobNotFound(LookupError):
+    pass
+
+
+class JobFinished(ValueError):
+    def __init__(self, status: str):
+        super().__init__(f"Job already {status}")
+        self.status = status
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job at its next checkpoint after a cancel."""
+
+
+class JobContext:
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.result_path: Optional[str] = None
+        self._reported_at = 0.0
+
+    def checkpoint(self, progress: float, force: bool = False) -> None:
+        """Record progress (0 to 1) and stop here if the job was cancelled."""
+        now = time.monotonic()
+        if not force and now - self._reported_at < PROGRESS_INTERVAL:
+            return
+        self._reported_at = now
+        with SessionLocal() as db:
+            cancel = db.execute(
+                update(Job)
+                .where(Job.id == self.job_id)
+                .values(progress=min(max(progress, 0.0), 1.0), updated_at=func.now())
+                .returning(Job.cancel_requested)
+            ).scalar()
+            db.commit()
+        if cancel:
+            raise JobCancelled()
+
+    def result_file(self, suffix: str) -> str:
+        """Path for the job's output file, served by GET /api/jobs/{id}/result."""
+        os.makedirs(JOB_RESULT_DIR, exist_ok=True)
+        self.result_path = os.path.abspath(
+            os.path.join(JOB_RESULT_DIR, f"job-{self.job_id}.{suffix}")
+        )
+        return self.result_path
+
+
+@dataclass(frozen=True)
+class JobKind:
+    params: Type[BaseModel]
+    run: Callable[[Session, Any, JobContext], Dict[str, Any]]
+
+
+JOB_KINDS: Dict[str, JobKind] = {}
+
+
+def job_kind(name: str, params: Type[BaseModel]):
+    def register(run):
+        JOB_KINDS[name] = JobKind(params, run)
+        return run
+    return register
+
+
+@job_kind("rebuild_daily_revenue", RollupRebuildJob)
+def _rebuild_daily_revenue(db: Session, params: RollupRebuildJob, context: JobContext):
+    context.checkpoint(0.0, force=True)
+    rows = revenue_rollup.rebuild_daily_revenue(db, params.start_date, params.end_date)
+    context.checkpoint(1.0, force=True)
+    db.commit()
+    get_revenue_cache().clear()
+    return {"rows": rows}
+
+
+@job_kind("sales_export", SalesExportJob)
+def _sales_export(db: Session, params: SalesExportJob, context: JobContext):
+    stmt = sales_export.export_statement(
+        params.start_date, params.end_date, params.product_id, params.category_id, params.platform
+    )
+    total = db.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar()
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+    path = context.result_file(params.format)
+    written = 0
+    with open(path, "w", newline="") as output:
+        for chunk in sales_export.iter_export(result, params.format):
+            output.write(chunk)
+            written += chunk.count("\n")
+            context.checkpoint(written / total if total else 1.0)
+    return {
+        "rows": total,
+        "bytes": os.path.getsize(path),
+        "media_type": sales_export.EXPORT_FORMATS[params.format],
+        "filename": f"sales_{params.start_date}_{params.end_date}.{params.format}",
+    }
+
+
+@job_kind("compact_inventory_history", HistoryCompactionJob)
+def _compact_inventory_history(db: Session, params: HistoryCompactionJob, context: JobContext):
+    partitions = [
+        (name, month)
+        for name, month in history_partitions.monthly_partitions(db)
+        if history_partitions.add_months(month, 1) <= params.before
+    ]
+    compacted = []
+    for done, (name, month) in enumerate(partitions):
+        context.checkpoint(done / len(partitions), force=True)
+        before, after = history_partitions.compact_partition(db, name, month)
+        # Each partition is swapped in its own transaction
+        db.commit()
+        compacted.append({"partition": name, "rows_before": before, "rows_after": after})
+    return {"partitions": compacted}
+
+
+@job_kind("revenue_comparison", PeriodComparison)
+def _revenue_comparison(db: Session, params: PeriodComparison, context: JobContext):
+    context.checkpoint(0.0, force=True)
+    args = (params.periods, params.breakdown, params.category_id, params.platform, params.product_id)
+    snapshot = get_sales_snapshot()
+    if snapshot is not None:
+        rows = snapshot.period_comparison(*args)
+    else:
+        rows = db.execute(revenue_queries.period_comparison(*args)).all()
+    response = revenue_queries.period_comparison_response(params, rows)
+    return response.model_dump(mode="json")
+
+
+def _finish(job_id: int, status: str, **values: Any) -> bool:
+    """Record the outcome of a running job; False if it was no longer running."""
+    with SessionLocal() as db:
+        extra = {"progress": 1.0} if status == SUCCEEDED else {}
+        finished = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == RUNNING)
+            .values(status=status, finished_at=func.now(), **extra, **values)
+        ).rowcount
+        db.commit()
+    if not finished:
+        logger.warning("Job %s was no longer running; %s not recorded", job_id, status)
+    return bool(finished)
+
+
+def _remove_file(path: Optional[str]) -> None:
+    # Partial output of a job that did not succeed
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+
+
+class JobRunner:
+    def __init__(self, workers: int):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._futures: Dict[int, Future] = {}
+        self._running: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def submit(self, job_id: int) -> None:
+        future = self.executor.submit(self._run, job_id)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget(job_id))
+
+    def _forget(self, job_id: int) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def discard(self, job_id: int) -> None:
+        """Drop a job that has not started from the pool's queue."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _beat(self) -> None:
+        while not self._stopped.wait(HEARTBEAT_INTERVAL):
+            with self._lock:
+                running = list(self._running)
+            if not running:
+                continue
+            try:
+                with SessionLocal() as db:
+                    db.execute(
+                        update(Job)
+                        .where(Job.id.in_(running), Job.status == RUNNING)
+                        .values(updated_at=func.now())
+                    )
+                    db.commit()
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    def _run(self, job_id: int) -> None:
+        with SessionLocal() as db:
+            job = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == QUEUED)
+                .values(status=RUNNING, started_at=func.now())
+                .returning(Job.kind, Job.params)
+            ).first()
+            db.commit()
+            if job is None:
+                # Cancelled, or claimed by another process
+                return
+
+            context = JobContext(job_id)
+            with self._lock:
+                self._running.add(job_id)
+            try:
+                kind = JOB_KINDS[job.kind]
+                result = kind.run(db, kind.params.model_validate(job.params), context)
+            except JobCancelled:
+                db.rollback()
+                _remove_file(context.result_path)
+                _finish(job_id, CANCELLED)
+            except Exception as e:
+                db.rollback()
+                _remove_file(context.result_path)
+                logger.exception("Job %s (%s) failed", job_id, job.kind)
+                _finish(job_id, FAILED, error=str(e) or type(e).__name__)
+            else:
+                if not _finish(job_id, SUCCEEDED, result=result, result_path=context.result_path):
+                    _remove_file(context.result_path)
+            finally:
+                with self._lock:
+                    self._running.discard(job_id)
+
+
+_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> Optional[JobRunner]:
+    return _runner
+
+
+def start_job_runner(db: Session) -> JobRunner:
+    """
+    Start this process's worker pool and pick up the queue. Jobs left running
+    without progress or heartbeat for JOB_STALE_SECONDS are presumed lost with
+    their process and marked failed.
+    """
+    global _runner
+    _runner = JobRunner(JOB_WORKERS)
+    db.execute(
+        update(Job)
+        .where(
+            Job.status == RUNNING,
+            Job.updated_at < func.now() - func.make_interval(0, 0, 0, 0, 0, 0, JOB_STALE_SECONDS),
+        )
+        .values(status=FAILED, error="Interrupted", finished_at=func.now())
+    )
+    db.commit()
+    for job_id in db.scalars(select(Job.id).where(Job.status == QUEUED).order_by(Job.id)):
+        _runner.submit(job_id)
+    return _runner
+
+
+def stop_job_runner() -> None:
+    global _runner
+    if _runner is not None:
+        _runner.shutdown()
+        _runner = None
+
+
+def submit_job(db: Session, kind: str, params: Dict[str, Any]) -> Job:
+    """
+    Validate and queue a job. Raises JobsDisabled, UnknownJobKind, pydantic's
+    ValidationError for bad params, or QueueFull.
+    """
+    if not JOBS_ENABLED:
+        raise JobsDisabled()
+    if kind not in JOB_KINDS:
+        raise UnknownJobKind(kind)
+    validated = JOB_KINDS[kind].params.model_validate(params)
+    queued = db.execute(select(func.count()).where(Job.status == QUEUED)).scalar()
+    if queued >= JOB_QUEUE_LIMIT:
+        raise QueueFull()
+
+    job = Job(
+        kind=kind,
+        status=QUEUED,
+        params=validated.model_dump(mode="json"),
+        progress=0.0,
+        cancel_requested=False,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    if _runner is not None:
+        _runner.submit(job.id)
+    return job
+
+
+def cancel_job(db: Session, job_id: int) -> Job:
+    """
+    Cancel a queued job outright, or ask a running one to stop at its next
+    checkpoint. Raises JobNotFound or JobFinished.
+    """
+    job = db.execute(select(Job).where(Job.id == job_id).with_for_update()).scalar()
+    if job is None:
+        raise JobNotFound(job_id)
+    if job.status in FINISHED:
+        raise JobFinished(job.status)
+    job.cancel_requested = True
+    if job.status == QUEUED:
+        job.status = CANCELLED
+        job.finished_at = func.now()
+    db.commit()
+    db.refresh(job)
+    if job.status == CANCELLED and _runner is not None:
+        _runner.discard(job_id)
+    return job
+
+
+def list_jobs(
+    db: Session,
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    before_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Job]:
+    """Jobs newest first."""
+    stmt = select(Job).order_by(Job.id.desc())
+    if status is not None:
+        stmt = stmt.where(Job.status == status)
+    if kind is not None:
+        stmt = stmt.where(Job.kind == kind)
+    if before_id is not None:
+        stmt = stmt.where(Job.id < before_id)
+    else:
+        stmt = stmt.offset(skip)
+    return list(db.scalars(stmt.limit(limit)))
@@ -0,0 +1,47 @@
+import re
+from typing import Any, List, Tuple
+from sqlalchemy import false, func, literal, or_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from app.models.models import Product
+
+# Ranked product search. A product matches when every word of the query is a
+# word or word prefix of its name, SKU or description (tsvector), when the query
+# is close to a word of its name (trigram word similarity, tolerates typos), or
+# when the query is a fragment of its SKU. Each test is served by one of the
+# GIN indexes on products, so matching never scans the table.
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def prefix_tsquery(q: str) -> str:
+    """`q` as a tsquery requiring every word as a prefix, e.g. 'blue:* & shi:*'."""
+    return " & ".join(f"{word}:*" for word in _WORD.findall(q.lower()))
+
+
+def search_terms(q: str) -> Tuple[Any, Any]:
+    """
+    The match condition and rank expression for `q`. Rank is double precision,
+    so values round-trip exactly through pagination cursors.
+    """
+    q = q.strip()
+    if not q:
+        return false(), literal(0.0).cast(DOUBLE_PRECISION)
+    text = literal(q)
+    conditions: List[Any] = [
+        Product.name.op("%>")(text),
+        Product.sku.ilike(f"%{_escape_like(q)}%", escape="\\"),
+    ]
+    ranks: List[Any] = [
+        func.word_similarity(text, Product.name),
+        func.similarity(text, Product.sku),
+    ]
+    tsquery_text = prefix_tsquery(q)
+    if tsquery_text:
+        tsquery = func.to_tsquery("simple", tsquery_text)
+        conditions.append(Product.search_vector.op("@@")(tsquery))
+        ranks.append(func.ts_rank(Product.search_vector, tsquery))
+    return or_(*conditions), func.greatest(*ranks).cast(DOUBLE_PRECISION)
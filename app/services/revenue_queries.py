@@ -0,0 +1,452 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import Date, Integer, cast, extract, func, literal_column, or_, select
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from app.models.models import Category, DailyRevenue, Product
+from app.schemas.schemas import (
+    PeriodComparison,
+    PeriodComparisonGroup,
+    PeriodComparisonResponse,
+    PeriodRevenue,
+    RevenueComparison,
+    RevenueComparisonResponse,
+    RevenuePeriod,
+    RevenueData,
+    RevenueResponse,
+    RevenueSeries,
+    RevenueSeriesResponse,
+    TopSeller,
+    TopSellersResponse,
+)
+
+# Statement builders and result assembly shared by the sync and async revenue
+# routers. Builders only construct SQL; callers execute them on their session.
+
+SERIES_GRANULARITIES = ("day", "week", "month", "year")
+SERIES_BREAKDOWNS = {
+    "category": DailyRevenue.category_id,
+    "platform": DailyRevenue.platform,
+}
+COMPARISON_BREAKDOWNS = {
+    **SERIES_BREAKDOWNS,
+    "product": DailyRevenue.product_id,
+}
+
+TOP_GROUPS = COMPARISON_BREAKDOWNS
+TOP_METRICS = ("revenue", "units")
+
+
+def _in_range(start_date: date, end_date: date):
+    return (DailyRevenue.sales_date >= start_date, DailyRevenue.sales_date <= end_date)
+
+
+def daily_revenue(start_date: date, end_date: date) -> Select:
+    return (
+        select(
+            DailyRevenue.sales_date.label("date"),
+            func.sum(DailyRevenue.revenue).label("revenue"),
+        )
+        .where(*_in_range(start_date, end_date))
+        .group_by(DailyRevenue.sales_date)
+        .order_by(DailyRevenue.sales_date)
+    )
+
+
+def _calendar_revenue(field: str, start_date: date, end_date: date) -> Select:
+    year = extract("year", DailyRevenue.sales_date)
+    part = extract(field, DailyRevenue.sales_date)
+    return (
+        select(
+            year.label("year"),
+            part.label(field),
+            # Use first day with sales in the bucket as date
+            func.min(DailyRevenue.sales_date).label("date"),
+            func.sum(DailyRevenue.revenue).label("revenue"),
+        )
+        .where(*_in_range(start_date, end_date))
+        .group_by(year, part)
+        .order_by(year, part)
+    )
+
+
+def weekly_revenue(start_date: date, end_date: date) -> Select:
+    return _calendar_revenue("week", start_date, end_date)
+
+
+def monthly_revenue(start_date: date, end_date: date) -> Select:
+    return _calendar_revenue("month", start_date, end_date)
+
+
+def yearly_revenue(start_date: date, end_date: date) -> Select:
+    year = extract("year", DailyRevenue.sales_date)
+    return (
+        select(
+            year.label("year"),
+            func.make_date(cast(year, Integer), 1, 1).label("date"),
+            func.sum(DailyRevenue.revenue).label("revenue"),
+        )
+        .where(*_in_range(start_date, end_date))
+        .group_by(year)
+        .order_by(year)
+    )
+
+
+def revenue_response(rows: Sequence[Any]) -> RevenueResponse:
+    result = [RevenueData(date=item.date, revenue=item.revenue) for item in rows]
+    total_revenue = sum(item.revenue for item in result)
+    return RevenueResponse(data=result, total_revenue=total_revenue)
+
+
+def parse_granularities(granularity: str) -> List[str]:
+    """Split and validate a comma-separated granularity list, keeping order."""
+    granularities = []
+    for value in granularity.split(","):
+        value = value.strip().lower()
+        if value not in SERIES_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {value}")
+        if value not in granularities:
+            granularities.append(value)
+    return granularities
+
+
+def _bucket(granularity: str):
+    if granularity == "day":
+        return DailyRevenue.sales_date
+    # Literal unit keeps the SELECT and GROUPING SETS expressions textually identical
+    unit = literal_column(f"'{granularity}'")
+    return cast(func.date_trunc(unit, DailyRevenue.sales_date), Date)
+
+
+def revenue_series(
+    start_date: date,
+    end_date: date,
+    granularities: List[str],
+    breakdown: Optional[str] = None,
+    category_id: Optional[int] = None,
+    platform: Optional[str] = None,
+) -> Select:
+    """One GROUPING SETS statement covering every requested granularity."""
+    if breakdown is not None and breakdown not in SERIES_BREAKDOWNS:
+        raise ValueError(f"Unsupported breakdown: {breakdown}")
+
+    buckets = {name: _bucket(name) for name in granularities}
+    breakdown_column = SERIES_BREAKDOWNS.get(breakdown)
+    grouping_sets = [
+        tuple_(bucket) if breakdown_column is None else tuple_(bucket, breakdown_column)
+        for bucket in buckets.values()
+    ]
+
+    columns = [bucket.label(name) for name, bucket in buckets.items()]
+    columns += [
+        func.grouping(bucket).label(f"{name}_grouping")
+        for name, bucket in buckets.items()
+    ]
+    if breakdown_column is not None:
+        columns.append(breakdown_column.label("breakdown"))
+    columns.append(func.sum(DailyRevenue.revenue).label("revenue"))
+
+    stmt = select(*columns).where(*_in_range(start_date, end_date))
+    if category_id is not None:
+        stmt = stmt.where(DailyRevenue.category_id == category_id)
+    if platform is not None:
+        stmt = stmt.where(DailyRevenue.platform == platform)
+
+    return stmt.group_by(func.grouping_sets(*grouping_sets))
+
+
+def revenue_series_response(
+    rows: Sequence[Any],
+    granularities: List[str],
+    breakdown: Optional[str] = None,
+    category_id: Optional[int] = None,
+    platform: Optional[str] = None,
+) -> RevenueSeriesResponse:
+    series = {}
+    if breakdown is None:
+        series = {(name, None): [] for name in granularities}
+    for row in rows:
+        name = next(
+            name for name in granularities if getattr(row, f"{name}_grouping") == 0
+        )
+        key_value = row.breakdown if breakdown is not None else None
+        series.setdefault((name, key_value), []).append(
+            RevenueData(date=getattr(row, name), revenue=row.revenue)
+        )
+
+    result = []
+    for (name, key_value), data in sorted(
+        series.items(),
+        key=lambda item: (
+            granularities.index(item[0][0]),
+            item[0][1] is None,
+            str(item[0][1]),
+        ),
+    ):
+        data.sort(key=lambda item: item.date)
+        result.append(
+            RevenueSeries(
+                granularity=name,
+                category_id=key_value if breakdown == "category" else category_id,
+                platform=key_value if breakdown == "platform" else platform,
+                data=data,
+                total_revenue=sum(item.revenue for item in data),
+            )
+        )
+
+    return RevenueSeriesResponse(series=result)
+
+
+def period_comparison(
+    periods: Sequence[RevenuePeriod],
+    breakdown: Optional[str] = None,
+    category_id: Optional[int] = None,
+    platform: Optional[str] = None,
+    product_id: Optional[int] = None,
+) -> Select:
+    """
+    Revenue and units for any number of periods in a single scan.
+
+    Rows are restricted to the union of the periods and every period is its own
+    SUM ... FILTER aggregate, so the cost follows the rows in that union rather
+    than the number of periods.
+    """
+    if breakdown is not None and breakdown not in COMPARISON_BREAKDOWNS:
+        raise ValueError(f"Unsupported breakdown: {breakdown}")
+
+    breakdown_column = COMPARISON_BREAKDOWNS.get(breakdown)
+    columns = [] if breakdown_column is None else [breakdown_column.label("key")]
+    ranges = []
+    for index, period in enumerate(periods):
+        in_period = DailyRevenue.sales_date.between(period.start_date, period.end_date)
+        ranges.append(in_period)
+        columns.append(
+            func.sum(DailyRevenue.revenue).filter(in_period).label(f"revenue_{index}")
+        )
+        columns.append(func.sum(DailyRevenue.units).filter(in_period).label(f"units_{index}"))
+
+    stmt = select(*columns).where(or_(*ranges))
+    if category_id is not None:
+        stmt = stmt.where(DailyRevenue.category_id == category_id)
+    if platform is not None:
+        stmt = stmt.where(DailyRevenue.platform == platform)
+    if product_id is not None:
+        stmt = stmt.where(DailyRevenue.product_id == product_id)
+    if breakdown_column is not None:
+        stmt = stmt.group_by(breakdown_column)
+    return stmt
+
+
+def _percentage_change(previous: Decimal, current: Decimal) -> Decimal:
+    if previous == 0:
+        return Decimal("100.0") if current > 0 else Decimal("0.0")
+    return ((current - previous) / previous) * 100
+
+
+def _period_revenues(
+    periods: Sequence[RevenuePeriod], revenues: Sequence[Decimal], units: Sequence[int]
+) -> List[PeriodRevenue]:
+    result = []
+    for index, period in enumerate(periods):
+        days = (period.end_date - period.start_date).days + 1
+        previous = revenues[index - 1] if index > 0 else None
+        result.append(
+            PeriodRevenue(
+                label=period.label,
+                start_date=period.start_date,
+                end_date=period.end_date,
+                days=days,
+                revenue=revenues[index],
+                units=units[index],
+                daily_avg=revenues[index] / days,
+                change=None if previous is None else revenues[index] - previous,
+                percentage_change=(
+                    None if previous is None else _percentage_change(previous, revenues[index])
+                ),
+            )
+        )
+    return result
+
+
+def period_comparison_response(
+    comparison: PeriodComparison, rows: Sequence[Any]
+) -> PeriodComparisonResponse:
+    periods = comparison.periods
+    count = len(periods)
+
+    def totals_of(row):
+        revenues = [getattr(row, f"revenue_{i}") or Decimal("0.0") for i in range(count)]
+        units = [getattr(row, f"units_{i}") or 0 for i in range(count)]
+        return revenues, units
+
+    if comparison.breakdown is None:
+        revenues, units = totals_of(rows[0]) if rows else ([Decimal("0.0")] * count, [0] * count)
+        return PeriodComparisonResponse(
+            totals=_period_revenues(periods, revenues, units), groups=[]
+        )
+
+    grouped = [(row.key, *totals_of(row)) for row in rows]
+    total_revenues = [sum((group[1][i] for group in grouped), Decimal("0.0")) for i in range(count)]
+    total_units = [sum(group[2][i] for group in grouped) for i in range(count)]
+
+    # Largest groups in the most recent period first
+    grouped.sort(key=lambda group: (-group[1][-1], group[0] is None, str(group[0])))
+    if comparison.limit is not None:
+        grouped = grouped[: comparison.limit]
+
+    return PeriodComparisonResponse(
+        breakdown=comparison.breakdown,
+        totals=_period_revenues(periods, total_revenues, total_units),
+        groups=[
+            PeriodComparisonGroup(key=key, periods=_period_revenues(periods, revenues, units))
+            for key, revenues, units in grouped
+        ],
+    )
+
+
+def comparison_periods(comparison: RevenueComparison) -> List[RevenuePeriod]:
+    return [
+        RevenuePeriod(start_date=comparison.period1_start, end_date=comparison.period1_end),
+        RevenuePeriod(start_date=comparison.period2_start, end_date=comparison.period2_end),
+    ]
+
+
+def comparison_statement(comparison: RevenueComparison) -> Select:
+    return period_comparison(comparison_periods(comparison), category_id=comparison.category_id)
+
+
+def comparison_response(
+    comparison: RevenueComparison,
+    period1_revenue: Optional[Decimal],
+    period2_revenue: Optional[Decimal],
+) -> RevenueComparisonResponse:
+    period1_revenue = period1_revenue or Decimal("0.0")
+    period2_revenue = period2_revenue or Decimal("0.0")
+
+    percentage_change = _percentage_change(period1_revenue, period2_revenue)
+
+    period1_days = (comparison.period1_end - comparison.period1_start).days + 1
+    period2_days = (comparison.period2_end - comparison.period2_start).days + 1
+
+    return RevenueComparisonResponse(
+        period1={
+            "start_date": comparison.period1_start,
+            "end_date": comparison.period1_end,
+            "revenue": period1_revenue,
+            "days": period1_days,
+            "daily_avg": (
+                period1_revenue / period1_days if period1_days > 0 else Decimal("0.0")
+            ),
+        },
+        period2={
+            "start_date": comparison.period2_start,
+            "end_date": comparison.period2_end,
+            "revenue": period2_revenue,
+            "days": period2_days,
+            "daily_avg": (
+                period2_revenue / period2_days if period2_days > 0 else Decimal("0.0")
+            ),
+        },
+        percentage_change=percentage_change,
+    )
+
+
+def top_sellers(
+    start_date: date,
+    end_date: date,
+    group_by: str = "product",
+    metric: str = "revenue",
+    limit: int = 10,
+    category_id: Optional[int] = None,
+    platform: Optional[str] = None,
+) -> Select:
+    """
+    Top groups by revenue or units, ranked in the database.
+
+    The inner query aggregates and ranks every group and carries the grand
+    totals as window sums (evaluated before LIMIT); the outer query joins names
+    for just the surviving rows, so it stays one round trip whatever the
+    catalog size.
+    """
+    if group_by not in TOP_GROUPS:
+        raise ValueError(f"Unsupported group_by: {group_by}")
+    if metric not in TOP_METRICS:
+        raise ValueError(f"Unsupported metric: {metric}")
+
+    key = TOP_GROUPS[group_by]
+    revenue = func.sum(DailyRevenue.revenue)
+    units = func.sum(DailyRevenue.units)
+    measure = revenue if metric == "revenue" else units
+    stmt = select(
+        key.label("key"),
+        revenue.label("revenue"),
+        units.label("units"),
+        func.sum(DailyRevenue.sale_count).label("sale_count"),
+        func.rank().over(order_by=measure.desc()).label("rank"),
+        func.sum(revenue).over().label("total_revenue"),
+        func.sum(units).over().label("total_units"),
+    ).where(*_in_range(start_date, end_date))
+    if category_id is not None:
+        stmt = stmt.where(DailyRevenue.category_id == category_id)
+    if platform is not None:
+        stmt = stmt.where(DailyRevenue.platform == platform)
+    ranked = stmt.group_by(key).order_by(measure.desc(), key).limit(limit).subquery()
+
+    if group_by == "product":
+        names = [Product.name, Product.sku]
+        target = (Product, Product.id == ranked.c.key)
+    elif group_by == "category":
+        names = [Category.name, literal_column("NULL").label("sku")]
+        target = (Category, Category.id == ranked.c.key)
+    else:
+        names = [ranked.c.key.label("name"), literal_column("NULL").label("sku")]
+        target = None
+
+    stmt = select(*ranked.c, *names)
+    if target is not None:
+        stmt = stmt.select_from(ranked).outerjoin(*target)
+    return stmt.order_by(ranked.c.rank, ranked.c.key)
+
+
+def top_seller_names(group_by: str, keys: Sequence[Any]) -> Optional[Select]:
+    """(key, name, sku) for ranked product or category keys; platforms are their own name."""
+    if group_by == "product":
+        return select(Product.id, Product.name, Product.sku).where(Product.id.in_(keys))
+    if group_by == "category":
+        return select(Category.id, Category.name, literal_column("NULL")).where(
+            Category.id.in_(keys)
+        )
+    return None
+
+
+def top_sellers_response(
+    rows: Sequence[Any], start_date: date, end_date: date, group_by: str, metric: str
+) -> TopSellersResponse:
+    total_revenue = rows[0].total_revenue if rows else Decimal("0.0")
+    total_units = rows[0].total_units if rows else 0
+    return TopSellersResponse(
+        group_by=group_by,
+        metric=metric,
+        start_date=start_date,
+        end_date=end_date,
+        total_revenue=total_revenue,
+        total_units=total_units,
+        items=[
+            TopSeller(
+                rank=row.rank,
+                key=row.key,
+                name=row.name,
+                sku=row.sku,
+                revenue=row.revenue,
+                units=row.units,
+                sale_count=row.sale_count,
+                revenue_share=(
+                    (row.revenue / total_revenue * 100).quantize(Decimal("0.01"))
+                    if total_revenue
+                    else Decimal("0.0")
+                ),
+            )
+            for row in rows
+        ],
+    )
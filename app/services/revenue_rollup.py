@@ -0,0 +1,126 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+from sqlalchemy import func, insert, delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.models import DailyRevenue, Product, Sale
+
+RollupKey = Tuple[date, int, Optional[str]]
+
+
+def apply_sales(
+    db: Session,
+    sales: Iterable[Any],
+    category_ids: Mapping[int, Optional[int]],
+) -> None:
+    """
+    Fold new sales into the daily_revenue rollup inside the caller's transaction.
+
+    `sales` may be ORM rows or schemas exposing sales_date, product_id, platform,
+    quantity and total_price. Rows sharing a (date, product, platform) key are
+    merged first so a batch costs one upsert statement.
+    """
+    buckets: Dict[RollupKey, Dict[str, Any]] = defaultdict(
+        lambda: {"revenue": Decimal("0"), "units": 0, "sale_count": 0}
+    )
+    for sale in sales:
+        bucket = buckets[(sale.sales_date, sale.product_id, sale.platform)]
+        bucket["revenue"] += sale.total_price
+        bucket["units"] += sale.quantity
+        bucket["sale_count"] += 1
+
+    if not buckets:
+        return
+
+    # Sorted keys give concurrent writers a consistent lock order on the rollup rows
+    rows = [
+        {
+            "sales_date": sales_date,
+            "product_id": product_id,
+            "category_id": category_ids.get(product_id),
+            "platform": platform,
+            **totals,
+        }
+        for (sales_date, product_id, platform), totals in sorted(
+            buckets.items(), key=lambda item: (item[0][0], item[0][1], item[0][2] or "")
+        )
+    ]
+
+    table = DailyRevenue.__table__
+    stmt = pg_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            table.c.sales_date,
+            table.c.product_id,
+            func.coalesce(table.c.platform, ""),
+        ],
+        set_={
+            "revenue": table.c.revenue + stmt.excluded.revenue,
+            "units": table.c.units + stmt.excluded.units,
+            "sale_count": table.c.sale_count + stmt.excluded.sale_count,
+            "category_id": stmt.excluded.category_id,
+        },
+    )
+    # executemany lets SQLAlchemy batch the rows into multi-row VALUES
+    # without compiling a statement per batch size
+    db.execute(stmt, rows)
+
+
+def reassign_category(db: Session, product_id: int, category_id: Optional[int]) -> None:
+    """Keep the denormalized category on rollup rows in step with the product."""
+    db.query(DailyRevenue).filter(DailyRevenue.product_id == product_id).update(
+        {DailyRevenue.category_id: category_id}, synchronize_session=False
+    )
+
+
+def rebuild_daily_revenue(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> int:
+    """
+    Recompute the rollup from the raw sales table for an optional date range.
+
+    Runs as a single delete + INSERT ... SELECT so readers see either the old or
+    the rebuilt rows. Returns the number of rollup rows written.
+    """
+    delete_stmt = delete(DailyRevenue)
+    source = (
+        select(
+            Sale.sales_date,
+            Sale.product_id,
+            Product.category_id,
+            Sale.platform,
+            func.sum(Sale.total_price),
+            func.sum(Sale.quantity),
+            func.count(Sale.id),
+        )
+        .join(Product, Product.id == Sale.product_id)
+        .group_by(Sale.sales_date, Sale.product_id, Product.category_id, Sale.platform)
+    )
+
+    if start_date is not None:
+        delete_stmt = delete_stmt.where(DailyRevenue.sales_date >= start_date)
+        source = source.where(Sale.sales_date >= start_date)
+    if end_date is not None:
+        delete_stmt = delete_stmt.where(DailyRevenue.sales_date <= end_date)
+        source = source.where(Sale.sales_date <= end_date)
+
+    db.execute(delete_stmt)
+    result = db.execute(
+        insert(DailyRevenue).from_select(
+            [
+                DailyRevenue.sales_date,
+                DailyRevenue.product_id,
+                DailyRevenue.category_id,
+                DailyRevenue.platform,
+                DailyRevenue.revenue,
+                DailyRevenue.units,
+                DailyRevenue.sale_count,
+            ],
+            source,
+        )
+    )
+    return result.rowcount
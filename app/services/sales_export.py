@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+from typing import Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.engine import Result
+from sqlalchemy.sql import Select
+from app.models.models import Product, Sale
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = (
+    Sale.id,
+    Sale.order_id,
+    Sale.sales_date,
+    Sale.product_id,
+    Product.sku,
+    Product.name.label("product_name"),
+    Product.category_id,
+    Sale.platform,
+    Sale.customer_id,
+    Sale.quantity,
+    Sale.unit_price,
+    Sale.total_price,
+)
+
+
+def export_statement(
+    start_date: date,
+    end_date: date,
+    product_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    platform: Optional[str] = None,
+) -> Select:
+    """Flat column select for an export; no ORM entities are built per row."""
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .join(Product, Product.id == Sale.product_id)
+        .where(Sale.sales_date >= start_date, Sale.sales_date <= end_date)
+    )
+    if product_id is not None:
+        stmt = stmt.where(Sale.product_id == product_id)
+    if category_id is not None:
+        stmt = stmt.where(Product.category_id == category_id)
+    if platform is not None:
+        stmt = stmt.where(Sale.platform == platform)
+    return stmt.order_by(Sale.sales_date, Sale.id)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_csv(result: Result) -> Iterator[str]:
+    """Yield a header line, then one CSV chunk per fetched partition."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(result.keys())
+    for partition in result.partitions():
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(result: Result) -> Iterator[str]:
+    """Yield one newline-delimited JSON chunk per fetched partition."""
+    keys = list(result.keys())
+    for partition in result.partitions():
+        yield "".join(
+            json.dumps(dict(zip(keys, row)), default=_json_default) + "\n"
+            for row in partition
+        )
+
+
+def iter_export(result: Result, export_format: str) -> Iterator[str]:
+    """Stream `result` in the requested format, closing the cursor when done."""
+    try:
+        if export_format == "csv":
+            yield from iter_csv(result)
+        else:
+            yield from iter_ndjson(result)
+    finally:
+        result.close()
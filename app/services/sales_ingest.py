@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+from typing import Any, Dict, List
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.orm import Session
+from app.cache.revenue import get_revenue_cache
+from app.db.copy import copy_rows
+from app.models.models import Product, Sale
+from app.schemas.schemas import BulkSaleError, BulkSaleResponse, SaleCreate
+from app.services import inventory_adjustments, revenue_rollup, sales_snapshot
+
+SALE_COLUMNS = (
+    "order_id",
+    "product_id",
+    "quantity",
+    "unit_price",
+    "total_price",
+    "customer_id",
+    "sales_date",
+    "platform",
+)
+
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+_sale_list_adapter = TypeAdapter(List[SaleCreate])
+
+
+class UnsupportedPayload(ValueError):
+    pass
+
+
+class MalformedRow:
+    """Stands in for an NDJSON line that is not valid JSON."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+
+
+def _parse_line(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return MalformedRow(f"Invalid JSON: {e}")
+
+
+def parse_payload(body: bytes, content_type: str) -> List[Any]:
+    """
+    Split a bulk request body into raw row objects.
+
+    Accepts a JSON array (application/json), newline-delimited JSON
+    (application/x-ndjson) or CSV with a header row (text/csv).
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    text = body.decode("utf-8-sig")
+
+    if media_type == "application/json":
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise UnsupportedPayload("Expected a JSON array of sales")
+        return rows
+
+    if media_type in NDJSON_MEDIA_TYPES:
+        # A bad line is reported against its row instead of failing the request
+        return [_parse_line(line) for line in text.splitlines() if line.strip()]
+
+    if media_type == "text/csv":
+        reader = csv.DictReader(io.StringIO(text))
+        # Empty CSV cells mean "not provided" for the optional columns
+        return [
+            {key: (value if value != "" else None) for key, value in row.items()}
+            for row in reader
+        ]
+
+    raise UnsupportedPayload(f"Unsupported content type: {media_type or 'none'}")
+
+
+def ingest_sales(
+    db: Session, raw_rows: List[Any], batch_size: int = 5000
+) -> BulkSaleResponse:
+    """
+    Validate and insert a batch of sales in one transaction.
+
+    Invalid rows are reported individually and skipped; valid rows are loaded
+    with COPY in chunks of `batch_size` and folded into the revenue rollup.
+    With SALES_DECREMENT_STOCK enabled, stock is taken out in the same
+    transaction and rows refused for lack of stock are reported as well.
+    """
+    errors = [
+        BulkSaleError(row=index, detail=row.detail)
+        for index, row in enumerate(raw_rows)
+        if isinstance(row, MalformedRow)
+    ]
+    indexes = [
+        index for index, row in enumerate(raw_rows) if not isinstance(row, MalformedRow)
+    ]
+
+    # Validating the whole list in one call is much cheaper than per row; on
+    # failure, report the offending rows and validate the remainder again.
+    try:
+        validated = _sale_list_adapter.validate_python([raw_rows[index] for index in indexes])
+    except ValidationError as e:
+        messages: Dict[int, List[str]] = {}
+        for item in e.errors():
+            position, *loc = item["loc"]
+            field = ".".join(str(part) for part in loc) or "row"
+            messages.setdefault(indexes[position], []).append(f"{field}: {item['msg']}")
+        errors.extend(
+            BulkSaleError(row=index, detail="; ".join(detail))
+            for index, detail in messages.items()
+        )
+        indexes = [index for index in indexes if index not in messages]
+        validated = _sale_list_adapter.validate_python(
+            [raw_rows[index] for index in indexes]
+        )
+    sales = list(zip(indexes, validated))
+
+    product_ids = {sale.product_id for _, sale in sales}
+    category_ids: Dict[int, Any] = {}
+    if product_ids:
+        category_ids = dict(
+            db.query(Product.id, Product.category_id)
+            .filter(Product.id.in_(product_ids))
+            .all()
+        )
+
+    accepted = []
+    for index, sale in sales:
+        if sale.product_id not in category_ids:
+            errors.append(BulkSaleError(row=index, detail="Product not found"))
+        else:
+            accepted.append((index, sale))
+
+    backordered: List[int] = []
+    if accepted and inventory_adjustments.SALES_DECREMENT_STOCK != "off":
+        refused, backordered = inventory_adjustments.decrement_stock(
+            db,
+            [(sale.product_id, sale.quantity) for _, sale in accepted],
+            backorder=inventory_adjustments.SALES_DECREMENT_STOCK == "backorder",
+        )
+        errors.extend(
+            BulkSaleError(row=accepted[position][0], detail=detail)
+            for position, detail in refused.items()
+        )
+        accepted = [line for position, line in enumerate(accepted) if position not in refused]
+    valid = [sale for _, sale in accepted]
+
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        copy_rows(
+            db,
+            Sale.__table__,
+            SALE_COLUMNS,
+            ([sale.__dict__[column] for column in SALE_COLUMNS] for sale in batch),
+        )
+    revenue_rollup.apply_sales(db, valid, category_ids)
+
+    db.commit()
+
+    cache = get_revenue_cache()
+    for sales_date in {sale.sales_date for sale in valid}:
+        cache.invalidate_date(sales_date)
+    sales_snapshot.record_sales(valid, category_ids)
+
+    errors.sort(key=lambda error: error.row)
+    return BulkSaleResponse(
+        received=len(raw_rows),
+        inserted=len(valid),
+        failed=len(errors),
+        errors=errors,
+        backordered=backordered,
+    )
@@ -0,0 +1,547 @@
+import io
+import os
+import logging
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.schemas.schemas import RevenuePeriod
+from app.services.revenue_queries import (
+    COMPARISON_BREAKDOWNS,
+    SERIES_BREAKDOWNS,
+    TOP_GROUPS,
+    TOP_METRICS,
+)
+
+# Optional in-process columnar copy of the sales columns the revenue
+# endpoints aggregate. Each sale is a row across five NumPy arrays (day number,
+# product id, dictionary-encoded platform, quantity, total price in cents);
+# products map to categories through a separate array so recategorising a
+# product is O(1). Query methods mirror the statement builders in
+# revenue_queries and return rows with the same attributes, so the existing
+# response builders are reused unchanged.
+#
+# The bulk of the rows is kept sorted by day so a date range is a pair of
+# binary searches; sales appended since the last compaction sit in a small
+# unsorted tail that is masked on every query. Each worker process holds its
+# own snapshot and only sees writes made through it.
+
+logger = logging.getLogger(__name__)
+
+SALES_SNAPSHOT = os.getenv("SALES_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+
+COLUMNS = ("day", "product_id", "platform", "quantity", "cents")
+DTYPES = {
+    "day": np.int32,
+    "product_id": np.int32,
+    "platform": np.int16,
+    "quantity": np.int32,
+    "cents": np.int64,
+}
+NONE = -1
+# The tail is merged into the sorted rows once it outgrows this (or 1/16 of them)
+COMPACT_ROWS = 65536
+
+LOAD_QUERY = (
+    "SELECT sales_date - DATE '1970-01-01' AS day, product_id, platform, quantity, "
+    "(total_price * 100)::bigint AS cents FROM sales"
+)
+VERIFY_QUERY = (
+    "SELECT sales_date - DATE '1970-01-01', count(*), sum(quantity), "
+    "(sum(total_price) * 100)::bigint FROM sales GROUP BY sales_date"
+)
+
+Columns = Dict[str, np.ndarray]
+
+
+def _empty() -> Columns:
+    return {name: np.empty(0, dtype=dtype) for name, dtype in DTYPES.items()}
+
+
+def _day(value: date) -> int:
+    return (value - date(1970, 1, 1)).days
+
+
+def _date(day: int) -> date:
+    return date.fromordinal(date(1970, 1, 1).toordinal() + int(day))
+
+
+def _money(cents: Any) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _sums(index: np.ndarray, size: int, weights: np.ndarray) -> np.ndarray:
+    # bincount accumulates in float64, which is exact for totals below 2**53 cents
+    return np.rint(np.bincount(index, weights=weights, minlength=size)).astype(np.int64)
+
+
+def _bucket_days(days: np.ndarray, granularity: str) -> np.ndarray:
+    """First day of each day's week (ISO, Monday), month or year."""
+    if granularity == "day":
+        return days
+    if granularity == "week":
+        # 1970-01-01 was a Thursday
+        return days - (days + 3) % 7
+    unit = "M" if granularity == "month" else "Y"
+    return (
+        days.astype("datetime64[D]").astype(f"datetime64[{unit}]")
+        .astype("datetime64[D]").astype(np.int64)
+    )
+
+
+class _State:
+    """One immutable generation of the snapshot; writers swap in a new one."""
+
+    def __init__(self, rows: Columns, tail: Columns, categories: np.ndarray, platforms: List[str]):
+        self.rows = rows
+        self.tail = tail
+        self.categories = categories
+        self.platforms = platforms
+
+    @property
+    def size(self) -> int:
+        return len(self.rows["day"]) + len(self.tail["day"])
+
+    def platform_code(self, platform: str) -> Optional[int]:
+        try:
+            return self.platforms.index(platform)
+        except ValueError:
+            return None
+
+    def category_of(self, product_ids: np.ndarray) -> np.ndarray:
+        known = product_ids < len(self.categories)
+        return np.where(
+            known, self.categories[np.where(known, product_ids, 0)], NONE
+        ).astype(np.int32)
+
+    def between(self, start_date: date, end_date: date) -> Columns:
+        start, end = _day(start_date), _day(end_date)
+        low, high = np.searchsorted(self.rows["day"], [start, end + 1])
+        columns = {name: array[low:high] for name, array in self.rows.items()}
+        if len(self.tail["day"]):
+            mask = (self.tail["day"] >= start) & (self.tail["day"] <= end)
+            if mask.any():
+                columns = {
+                    name: np.concatenate([columns[name], self.tail[name][mask]])
+                    for name in COLUMNS
+                }
+        return columns
+
+
+class SalesSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = _State(_empty(), _empty(), np.empty(0, dtype=np.int32), [])
+        self.loaded_at: Optional[datetime] = None
+
+    # Loading and writes
+
+    def load(self, db: Session) -> int:
+        """Replace the snapshot with the current contents of the sales table."""
+        frame = _read_sales(db)
+        platforms = frame["platform"].astype("category")
+        rows = {
+            "day": frame["day"].to_numpy(np.int32),
+            "product_id": frame["product_id"].to_numpy(np.int32),
+            "platform": platforms.cat.codes.to_numpy().astype(np.int16),
+            "quantity": frame["quantity"].to_numpy(np.int32),
+            "cents": frame["cents"].to_numpy(np.int64),
+        }
+        order = np.argsort(rows["day"], kind="stable")
+        rows = {name: array[order] for name, array in rows.items()}
+
+        products = db.execute(text("SELECT id, category_id FROM products")).all()
+        size = max((product_id for product_id, _ in products), default=0) + 1
+        categories = np.full(size, NONE, dtype=np.int32)
+        for product_id, category_id in products:
+            categories[product_id] = NONE if category_id is None else category_id
+
+        with self._lock:
+            self._state = _State(
+                rows, _empty(), categories, [str(name) for name in platforms.cat.categories]
+            )
+            self.loaded_at = datetime.now()
+        return len(order)
+
+    def append(self, sales: Iterable[Any], category_ids: Mapping[int, Optional[int]]) -> None:
+        """
+        Add committed sales (ORM rows or schemas, as for revenue_rollup.apply_sales)
+        together with their products' categories.
+        """
+        sales = list(sales)
+        if not sales:
+            return
+        with self._lock:
+            state = self._state
+            platforms = list(state.platforms)
+            codes = []
+            for sale in sales:
+                if sale.platform is None:
+                    codes.append(NONE)
+                    continue
+                if sale.platform not in platforms:
+                    platforms.append(sale.platform)
+                codes.append(platforms.index(sale.platform))
+            new = {
+                "day": np.array([_day(sale.sales_date) for sale in sales], dtype=np.int32),
+                "product_id": np.array([sale.product_id for sale in sales], dtype=np.int32),
+                "platform": np.array(codes, dtype=np.int16),
+                "quantity": np.array([sale.quantity for sale in sales], dtype=np.int32),
+                "cents": np.array(
+                    [int(sale.total_price * 100) for sale in sales], dtype=np.int64
+                ),
+            }
+            tail = {name: np.concatenate([state.tail[name], new[name]]) for name in COLUMNS}
+            categories = _with_categories(state.categories, category_ids)
+            rows = state.rows
+            if len(tail["day"]) > max(COMPACT_ROWS, len(rows["day"]) // 16):
+                merged = {name: np.concatenate([rows[name], tail[name]]) for name in COLUMNS}
+                order = np.argsort(merged["day"], kind="stable")
+                rows, tail = {name: array[order] for name, array in merged.items()}, _empty()
+            self._state = _State(rows, tail, categories, platforms)
+
+    def reassign_category(self, product_id: int, category_id: Optional[int]) -> None:
+        with self._lock:
+            state = self._state
+            self._state = _State(
+                state.rows,
+                state.tail,
+                _with_categories(state.categories, {product_id: category_id}),
+                state.platforms,
+            )
+
+    # Queries
+
+    def _filtered(
+        self,
+        start_date: date,
+        end_date: date,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+        product_id: Optional[int] = None,
+    ) -> Tuple[_State, Columns]:
+        state = self._state
+        columns = state.between(start_date, end_date)
+        mask = None
+        if category_id is not None:
+            mask = state.category_of(columns["product_id"]) == category_id
+        if platform is not None:
+            code = state.platform_code(platform)
+            if code is None:
+                matches = np.zeros(len(columns["day"]), dtype=bool)
+            else:
+                matches = columns["platform"] == code
+            mask = matches if mask is None else mask & matches
+        if product_id is not None:
+            matches = columns["product_id"] == product_id
+            mask = matches if mask is None else mask & matches
+        if mask is not None:
+            columns = {name: array[mask] for name, array in columns.items()}
+        return state, columns
+
+    def _keys(
+        self, state: _State, columns: Columns, breakdown: str
+    ) -> Tuple[np.ndarray, np.ndarray, Callable[[int], Any]]:
+        """
+        Dense group index per row, the key code of each group and a decoder from
+        a code back to its key value. Codes are renumbered densely so a large id
+        does not size the arrays.
+        """
+        if breakdown == "product":
+            codes, decode = columns["product_id"].astype(np.int64), int
+        elif breakdown == "category":
+            codes = state.category_of(columns["product_id"]).astype(np.int64) + 1
+            decode = lambda code: None if code == 0 else code - 1
+        else:
+            codes = columns["platform"].astype(np.int64) + 1
+            platforms = state.platforms
+            decode = lambda code: None if code == 0 else platforms[code - 1]
+        values, index = np.unique(codes, return_inverse=True)
+        return index, values, decode
+
+    def daily_revenue(self, start_date: date, end_date: date) -> List[SimpleNamespace]:
+        _, columns = self._filtered(start_date, end_date)
+        start = _day(start_date)
+        offsets = (columns["day"] - start).astype(np.int64)
+        size = max(_day(end_date) - start + 1, 0)
+        counts = np.bincount(offsets, minlength=size)
+        revenue = _sums(offsets, size, columns["cents"])
+        return [
+            SimpleNamespace(date=_date(start + offset), revenue=_money(revenue[offset]))
+            for offset in np.flatnonzero(counts)
+        ]
+
+    def _calendar_revenue(self, field: str, start_date: date, end_date: date) -> List[SimpleNamespace]:
+        buckets: Dict[Tuple[int, int], SimpleNamespace] = {}
+        for row in self.daily_revenue(start_date, end_date):
+            part = row.date.isocalendar()[1] if field == "week" else row.date.month
+            key = (row.date.year, part)
+            if key in buckets:
+                buckets[key].revenue += row.revenue
+            else:
+                # First day with sales in the bucket dates it, as in SQL
+                buckets[key] = SimpleNamespace(date=row.date, revenue=row.revenue)
+        return [buckets[key] for key in sorted(buckets)]
+
+    def weekly_revenue(self, start_date: date, end_date: date) -> List[SimpleNamespace]:
+        return self._calendar_revenue("week", start_date, end_date)
+
+    def monthly_revenue(self, start_date: date, end_date: date) -> List[SimpleNamespace]:
+        return self._calendar_revenue("month", start_date, end_date)
+
+    def yearly_revenue(self, start_date: date, end_date: date) -> List[SimpleNamespace]:
+        years: Dict[int, Decimal] = {}
+        for row in self.daily_revenue(start_date, end_date):
+            years[row.date.year] = years.get(row.date.year, Decimal("0.00")) + row.revenue
+        return [
+            SimpleNamespace(date=date(year, 1, 1), revenue=revenue)
+            for year, revenue in sorted(years.items())
+        ]
+
+    def revenue_series(
+        self,
+        start_date: date,
+        end_date: date,
+        granularities: List[str],
+        breakdown: Optional[str] = None,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+    ) -> List[SimpleNamespace]:
+        if breakdown is not None and breakdown not in SERIES_BREAKDOWNS:
+            raise ValueError(f"Unsupported breakdown: {breakdown}")
+
+        state, columns = self._filtered(start_date, end_date, category_id, platform)
+        if breakdown is None:
+            keys, values, decode = np.zeros(len(columns["day"]), dtype=np.int64), None, None
+        else:
+            keys, values, decode = self._keys(state, columns, breakdown)
+        size = 1 if values is None else max(len(values), 1)
+
+        rows = []
+        for name in granularities:
+            buckets = _bucket_days(columns["day"].astype(np.int64), name)
+            first = int(buckets.min()) if len(buckets) else 0
+            # Only the (bucket, group) cells that have sales get a slot
+            cells, index = np.unique((buckets - first) * size + keys, return_inverse=True)
+            revenue = _sums(index, len(cells), columns["cents"])
+            for position, cell in enumerate(cells):
+                bucket, key = divmod(int(cell), size)
+                row = SimpleNamespace(revenue=_money(revenue[position]))
+                for other in granularities:
+                    setattr(row, other, _date(first + bucket) if other == name else None)
+                    setattr(row, f"{other}_grouping", 0 if other == name else 1)
+                if decode is not None:
+                    row.breakdown = decode(int(values[key]))
+                rows.append(row)
+        return rows
+
+    def period_comparison(
+        self,
+        periods: Sequence[RevenuePeriod],
+        breakdown: Optional[str] = None,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+        product_id: Optional[int] = None,
+    ) -> List[SimpleNamespace]:
+        if breakdown is not None and breakdown not in COMPARISON_BREAKDOWNS:
+            raise ValueError(f"Unsupported breakdown: {breakdown}")
+
+        def empty_row(**values):
+            row = SimpleNamespace(**values)
+            for index in range(len(periods)):
+                setattr(row, f"revenue_{index}", None)
+                setattr(row, f"units_{index}", None)
+            return row
+
+        groups: Dict[Any, SimpleNamespace] = {}
+        total = empty_row()
+        for index, period in enumerate(periods):
+            state, columns = self._filtered(
+                period.start_date, period.end_date, category_id, platform, product_id
+            )
+            if not len(columns["day"]):
+                continue
+            if breakdown is None:
+                setattr(total, f"revenue_{index}", _money(columns["cents"].sum()))
+                setattr(total, f"units_{index}", int(columns["quantity"].sum()))
+                continue
+            keys, values, decode = self._keys(state, columns, breakdown)
+            size = len(values)
+            revenue = _sums(keys, size, columns["cents"])
+            units = _sums(keys, size, columns["quantity"])
+            for position in range(size):
+                key = decode(int(values[position]))
+                row = groups.setdefault(key, empty_row(key=key))
+                setattr(row, f"revenue_{index}", _money(revenue[position]))
+                setattr(row, f"units_{index}", int(units[position]))
+        return [total] if breakdown is None else list(groups.values())
+
+    def top_sellers(
+        self,
+        start_date: date,
+        end_date: date,
+        group_by: str = "product",
+        metric: str = "revenue",
+        limit: int = 10,
+        category_id: Optional[int] = None,
+        platform: Optional[str] = None,
+    ) -> List[SimpleNamespace]:
+        """Ranked groups like revenue_queries.top_sellers, without product/category names."""
+        if group_by not in TOP_GROUPS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        if metric not in TOP_METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        state, columns = self._filtered(start_date, end_date, category_id, platform)
+        keys, values, decode = self._keys(state, columns, group_by)
+        size = len(values)
+        counts = np.bincount(keys, minlength=size)
+        revenue = _sums(keys, size, columns["cents"])
+        units = _sums(keys, size, columns["quantity"])
+        measure = revenue if metric == "revenue" else units
+
+        # Ties are broken by key ascending with NULL last, as ORDER BY does
+        if group_by == "platform":
+            # Platform codes follow insertion order, so rank the names; index -1 is NULL
+            ordinals = np.argsort(np.argsort(np.array(state.platforms, dtype=object)))
+            tiebreak = np.append(ordinals, len(ordinals))[values - 1]
+        else:
+            tiebreak = np.where(values == 0, np.iinfo(np.int64).max, values)
+        order = np.lexsort((tiebreak, -measure))[:limit]
+        descending = np.sort(-measure)
+        ranks = np.searchsorted(descending, -measure[order], side="left") + 1
+
+        total_revenue, total_units = _money(revenue.sum()), int(units.sum())
+        rows = []
+        for rank, position in zip(ranks, order):
+            key = decode(int(values[position]))
+            rows.append(
+                SimpleNamespace(
+                    key=key,
+                    revenue=_money(revenue[position]),
+                    units=int(units[position]),
+                    sale_count=int(counts[position]),
+                    rank=int(rank),
+                    total_revenue=total_revenue,
+                    total_units=total_units,
+                    name=key if group_by == "platform" else None,
+                    sku=None,
+                )
+            )
+        return rows
+
+    # Maintenance
+
+    def verify(self, db: Session) -> Dict[str, Any]:
+        """
+        Compare per-day sale count, units and revenue with the sales table.
+        Returns the row counts and the days that differ (at most 100).
+        """
+        state = self._state
+        expected = {
+            day: (count, units, cents)
+            for day, count, units, cents in db.execute(text(VERIFY_QUERY)).all()
+        }
+        columns = {
+            name: np.concatenate([state.rows[name], state.tail[name]]) for name in COLUMNS
+        }
+        days, index, counts = np.unique(columns["day"], return_inverse=True, return_counts=True)
+        units = _sums(index, len(days), columns["quantity"])
+        cents = _sums(index, len(days), columns["cents"])
+        actual = {
+            int(day): (int(count), int(unit), int(cent))
+            for day, count, unit, cent in zip(days, counts, units, cents)
+        }
+        mismatched = sorted(
+            day for day in set(expected) | set(actual) if expected.get(day) != actual.get(day)
+        )
+        return {
+            "consistent": not mismatched,
+            "snapshot_rows": state.size,
+            "database_rows": sum(count for count, _, _ in expected.values()),
+            "mismatched_days": [_date(day) for day in mismatched[:100]],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        return {
+            "rows": state.size,
+            "unsorted_rows": len(state.tail["day"]),
+            "platforms": len(state.platforms),
+            "bytes": sum(array.nbytes for array in (*state.rows.values(), *state.tail.values())),
+            "loaded_at": self.loaded_at,
+        }
+
+
+def _with_categories(categories: np.ndarray, category_ids: Mapping[int, Optional[int]]) -> np.ndarray:
+    if not category_ids:
+        return categories
+    size = max(len(categories), max(category_ids) + 1)
+    updated = np.full(size, NONE, dtype=np.int32)
+    updated[: len(categories)] = categories
+    for product_id, category_id in category_ids.items():
+        updated[product_id] = NONE if category_id is None else category_id
+    return updated
+
+
+def _read_sales(db: Session) -> pd.DataFrame:
+    """The snapshot columns of every sale, via COPY when the driver supports it."""
+    dbapi_connection = db.connection().connection.driver_connection
+    cursor = dbapi_connection.cursor()
+    if not hasattr(cursor, "copy_expert"):
+        cursor.close()
+        return pd.DataFrame(db.execute(text(LOAD_QUERY)).all(), columns=list(COLUMNS))
+
+    buffer = io.StringIO()
+    try:
+        cursor.copy_expert(f"COPY ({LOAD_QUERY}) TO STDOUT WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+    buffer.seek(0)
+    return pd.read_csv(
+        buffer,
+        names=list(COLUMNS),
+        dtype={"day": np.int32, "product_id": np.int32, "platform": "category",
+               "quantity": np.int32, "cents": np.int64},
+        keep_default_na=False,
+        na_values={"platform": [""]},
+    )
+
+
+sales_snapshot: Optional[SalesSnapshot] = None
+
+
+def get_sales_snapshot() -> Optional[SalesSnapshot]:
+    """The loaded snapshot, or None when queries should go to the database."""
+    return sales_snapshot
+
+
+def load_sales_snapshot(db: Session) -> SalesSnapshot:
+    global sales_snapshot
+    snapshot = sales_snapshot or SalesSnapshot()
+    rows = snapshot.load(db)
+    sales_snapshot = snapshot
+    logger.info("Loaded sales snapshot with %d rows", rows)
+    return snapshot
+
+
+def disable_sales_snapshot() -> None:
+    """Fall back to the database for every revenue query."""
+    global sales_snapshot
+    sales_snapshot = None
+
+
+def record_sales(sales: Iterable[Any], category_ids: Mapping[int, Optional[int]]) -> None:
+    """Append committed sales to the snapshot, if one is loaded."""
+    if sales_snapshot is not None:
+        sales_snapshot.append(sales, category_ids)
+
+
+def record_category(product_id: int, category_id: Optional[int]) -> None:
+    if sales_snapshot is not None:
+        sales_snapshot.reassign_category(product_id, category_id)
@@ -0,0 +1,139 @@
+"""
+Compare concurrent throughput of the analytics endpoints in sync and async mode.
+
+Starts the API twice under uvicorn (DB_ASYNC_MODE=false, then true) against
+the database in DATABASE_URL, with the revenue cache disabled so every request
+reaches Postgres, and drives both with the same fixed-concurrency load.
+
+    python benchmarks/async_throughput.py --concurrency 16 --requests 4000
+
+Keep --concurrency within the sync engine's pool (5 + 10 overflow by default);
+beyond it the sync mode queues on the pool and starts timing out.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+from datetime import date, timedelta
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def analytics_requests(days: int):
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    params = {"start_date": str(start_date), "end_date": str(end_date)}
+    comparison = {
+        "period1_start": str(start_date),
+        "period1_end": str(start_date + timedelta(days=days // 2)),
+        "period2_start": str(start_date + timedelta(days=days // 2 + 1)),
+        "period2_end": str(end_date),
+    }
+    return [
+        ("GET", "/api/sales/revenue/daily", params, None),
+        ("GET", "/api/sales/revenue/weekly", params, None),
+        ("GET", "/api/sales/revenue/monthly", params, None),
+        ("GET", "/api/sales/revenue/yearly", params, None),
+        ("GET", "/api/sales/revenue/series", params, None),
+        ("POST", "/api/sales/revenue/compare", None, comparison),
+    ]
+
+
+async def drive(base_url: str, total: int, concurrency: int, days: int):
+    plan = analytics_requests(days)
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(client):
+        nonlocal errors
+        for index in counter:
+            method, path, params, body = plan[index % len(plan)]
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+            except httpx.TransportError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+    async with client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API server did not start")
+
+
+def run_mode(async_mode: bool, args):
+    env = dict(
+        os.environ,
+        DB_ASYNC_MODE="true" if async_mode else "false",
+        REVENUE_CACHE_BACKEND="none",
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(args.port), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_ready(base_url)
+        # Warm up connection pools before measuring
+        asyncio.run(drive(base_url, args.concurrency * 2, args.concurrency, args.days))
+        return asyncio.run(drive(base_url, args.requests, args.concurrency, args.days))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {}
+    for label, async_mode in (("sync", False), ("async", True)):
+        results[label] = run_mode(async_mode, args)
+        print(f"{label:>5}: {results[label]}")
+
+    speedup = results["async"]["throughput_rps"] / results["sync"]["throughput_rps"]
+    print(f"async/sync throughput: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
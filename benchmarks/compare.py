@@ -0,0 +1,79 @@
+"""
+Compare two benchmark result files from benchmarks/load_test.py.
+
+    python benchmarks/compare.py benchmarks/results/base.json benchmarks/results/head.json
+
+Prints per-scenario p50/p95/p99 and throughput changes and exits with status 1
+when any scenario's p95 grows, or its throughput drops, by more than
+--threshold percent (default 10), so it can gate CI runs on the same machine.
+"""
+import sys
+import json
+import argparse
+
+
+def change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def fmt(value):
+    return "n/a" if value is None else f"{value:+.1f}%"
+
+
+def compare(base, head, threshold):
+    regressions = []
+    names = sorted(set(base["scenarios"]) | set(head["scenarios"]))
+    print(f"{'scenario':<22} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9}")
+    for name in names:
+        before = base["scenarios"].get(name)
+        after = head["scenarios"].get(name)
+        if before is None or after is None:
+            print(f"{name:<22} {'only in ' + ('head' if before is None else 'base'):>39}")
+            continue
+        deltas = {
+            key: change(before[key], after[key])
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        }
+        print(
+            f"{name:<22} {fmt(deltas['p50_ms']):>9} {fmt(deltas['p95_ms']):>9} "
+            f"{fmt(deltas['p99_ms']):>9} {fmt(deltas['throughput_rps']):>9}"
+        )
+        p95 = deltas["p95_ms"]
+        throughput = deltas["throughput_rps"]
+        if (p95 is not None and p95 > threshold) or (
+            throughput is not None and throughput < -threshold
+        ):
+            regressions.append(name)
+        if after["errors"] > before["errors"]:
+            regressions.append(name)
+    return sorted(set(regressions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with open(args.base) as handle:
+        base = json.load(handle)
+    with open(args.head) as handle:
+        head = json.load(handle)
+
+    print(f"base {base.get('revision')} ({base.get('dataset')})")
+    print(f"head {head.get('revision')} ({head.get('dataset')})")
+    if base.get("dataset") != head.get("dataset") or base.get("settings") != head.get("settings"):
+        print("warning: datasets or settings differ, deltas are not like for like")
+
+    regressions = compare(base, head, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Generate a synthetic dataset at production scale for the benchmark suite.
+
+Columns are generated with NumPy from a fixed seed, so the same arguments
+always produce the same data, and streamed into Postgres with COPY in chunks.
+Product popularity follows a power law and sales volume has a yearly
+seasonal swing so that date-range and top-N queries see realistic skew.
+
+    python benchmarks/datagen.py --reset --sales 10000000 --products 100000 --years 3
+
+Tables must be empty unless --reset is given, which truncates every
+application table (including daily_revenue) first.
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.database import SessionLocal, engine, Base
+from app.db.datagen import TABLES, copy_frame, day_weights, popularity, reset_sequences, sales_frame
+from app.services.revenue_rollup import rebuild_daily_revenue
+
+CUSTOMERS = 500_000
+
+
+def category_frame(count):
+    ids = np.arange(1, count + 1)
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "name": [f"Category {i}" for i in ids],
+            "description": [f"Synthetic benchmark category {i}" for i in ids],
+        }
+    )
+
+
+def product_frame(rng, count, categories):
+    ids = np.arange(1, count + 1)
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "name": [f"Product {i}" for i in ids],
+            "description": "Synthetic benchmark product",
+            "price": np.round(np.clip(rng.lognormal(3.5, 1.0, count), 1, 5000), 2),
+            "category_id": rng.integers(1, categories + 1, count),
+            "sku": [f"BM-{i:07d}" for i in ids],
+            "image_url": None,
+            "is_active": np.where(rng.random(count) < 0.97, "t", "f"),
+        }
+    )
+
+
+def inventory_frames(rng, products):
+    count = len(products)
+    quantity = rng.integers(0, 500, count)
+    threshold = rng.integers(5, 50, count)
+    inventory = pd.DataFrame(
+        {
+            "id": products["id"],
+            "product_id": products["id"],
+            "quantity": quantity,
+            "low_stock_threshold": threshold,
+        }
+    )
+    history = pd.DataFrame(
+        {
+            "id": products["id"],
+            "product_id": products["id"],
+            "quantity_change": quantity,
+            "new_quantity": quantity,
+            "change_reason": "Initial stock",
+            "changed_by": "datagen",
+        }
+    )
+    return inventory, history
+
+
+def generate(args):
+    rng = np.random.default_rng(args.seed)
+    Base.metadata.create_all(bind=engine)
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if args.reset:
+            cursor.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        else:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM products)")
+            if cursor.fetchone()[0]:
+                raise SystemExit("Tables are not empty; rerun with --reset to replace them")
+
+        started = time.perf_counter()
+        copy_frame(cursor, "categories", category_frame(args.categories))
+        products = product_frame(rng, args.products, args.categories)
+        copy_frame(cursor, "products", products)
+        inventory, history = inventory_frames(rng, products)
+        copy_frame(cursor, "inventory", inventory)
+        copy_frame(cursor, "inventory_history", history)
+        print(f"Loaded {args.categories} categories and {args.products} products")
+
+        end_date = date.today()
+        start_date = end_date - timedelta(days=int(365 * args.years))
+        date_cdf = np.cumsum(day_weights(start_date, (end_date - start_date).days + 1))
+        product_cdf = np.cumsum(popularity(rng, args.products, args.skew))
+        prices = products["price"].to_numpy()
+
+        loaded = 0
+        while loaded < args.sales:
+            size = min(args.chunk_size, args.sales - loaded)
+            chunk = sales_frame(
+                rng, loaded + 1, size, prices, product_cdf, date_cdf, start_date, CUSTOMERS
+            )
+            copy_frame(cursor, "sales", chunk)
+            loaded += size
+            rate = loaded / (time.perf_counter() - started)
+            print(f"  sales: {loaded}/{args.sales} ({rate:,.0f} rows/s)")
+
+        reset_sequences(cursor)
+        connection.commit()
+    finally:
+        connection.close()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_daily_revenue(db)
+        db.commit()
+        print(f"Rebuilt daily_revenue ({rows} rows)")
+    finally:
+        db.close()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sales", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--skew", type=float, default=1.1, help="Power-law exponent of product popularity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=500_000)
+    parser.add_argument("--reset", action="store_true", help="Truncate application tables first")
+    generate(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Drive every API endpoint at fixed concurrency and record latency percentiles.
+
+Each scenario (one endpoint with representative parameters drawn from the
+database) runs for --requests requests at --concurrency, after a short
+warm-up. Per-scenario p50/p95/p99 latency, throughput and error counts are
+written to a JSON file that benchmarks/compare.py can diff across commits.
+
+    python benchmarks/load_test.py --output benchmarks/results/$(git rev-parse --short HEAD).json
+
+By default a uvicorn server is started against DATABASE_URL with the revenue
+cache disabled; pass --base-url to measure an already running deployment.
+Destructive endpoints (DELETE) are not exercised, and write scenarios only
+create sales, adjust inventory for existing products and queue small jobs. Job
+scenarios run last because queued jobs keep running after they are submitted;
+job cancellation and result downloads are not measured.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from sqlalchemy import text
+from app.db.database import engine
+
+
+def dataset_profile():
+    """Row counts plus the id and date ranges scenarios draw parameters from."""
+    with engine.connect() as connection:
+        row = connection.execute(
+            text(
+                "SELECT (SELECT count(*) FROM sales), (SELECT count(*) FROM products), "
+                "(SELECT count(*) FROM categories), (SELECT min(id) FROM products), "
+                "(SELECT max(id) FROM products), (SELECT min(id) FROM categories), "
+                "(SELECT max(id) FROM categories), (SELECT min(sales_date) FROM sales), "
+                "(SELECT max(sales_date) FROM sales)"
+            )
+        ).one()
+    keys = [
+        "sales", "products", "categories", "min_product_id", "max_product_id",
+        "min_category_id", "max_category_id", "min_date", "max_date",
+    ]
+    profile = dict(zip(keys, row))
+    if profile["min_date"] is None:
+        raise SystemExit("No sales found; load data with benchmarks/datagen.py first")
+    return profile
+
+
+def scenarios(profile):
+    """(name, method, path template, request builder) for every endpoint."""
+    max_date = profile["max_date"]
+
+    def product_id(rng):
+        return rng.randint(profile["min_product_id"], profile["max_product_id"])
+
+    def category_id(rng):
+        return rng.randint(profile["min_category_id"], profile["max_category_id"])
+
+    def date_range(rng, days):
+        end = max_date - timedelta(days=rng.randint(0, 30))
+        return {"start_date": str(end - timedelta(days=days)), "end_date": str(end)}
+
+    def comparison(rng):
+        end = max_date - timedelta(days=rng.randint(0, 30))
+        return {
+            "period1_start": str(end - timedelta(days=729)),
+            "period1_end": str(end - timedelta(days=365)),
+            "period2_start": str(end - timedelta(days=364)),
+            "period2_end": str(end),
+        }
+
+    def quarters(rng):
+        end = max_date - timedelta(days=rng.randint(0, 30))
+        return [
+            {"start_date": str(end - timedelta(days=offset + 90)), "end_date": str(end - timedelta(days=offset))}
+            for offset in range(0, 365, 91)
+        ]
+
+    def adjustments(rng, size):
+        product_ids = rng.sample(
+            range(profile["min_product_id"], profile["max_product_id"] + 1),
+            min(size, profile["products"]),
+        )
+        return {
+            # Only restocks and absolute counts, so no batch is refused for negative stock
+            "adjustments": [
+                {"product_id": product_id, "delta": rng.randint(1, 20)}
+                if rng.random() < 0.5
+                else {"product_id": product_id, "quantity": rng.randint(0, 500)}
+                for product_id in product_ids
+            ],
+            "changed_by": "benchmark",
+            "change_reason": "Benchmark adjustment",
+        }
+
+    def new_sale(rng):
+        return {
+            "order_id": f"BENCH-{rng.getrandbits(48):x}",
+            "product_id": product_id(rng),
+            "quantity": 1,
+            "unit_price": "10.00",
+            "total_price": "10.00",
+            "sales_date": str(max_date),
+            "platform": "Company Website",
+        }
+
+    return [
+        ("products.list", "GET", "/api/products/", lambda r: {"params": {"limit": 100}}),
+        ("products.get", "GET", "/api/products/{id}", lambda r: {"id": product_id(r)}),
+        (
+            "products.search", "GET", "/api/products/search",
+            lambda r: {"params": {"q": f"Product {str(product_id(r))[:3]}", "limit": 20}},
+        ),
+        (
+            "products.update", "PUT", "/api/products/{id}",
+            lambda r: {"id": product_id(r), "json": {"description": "Benchmark update"}},
+        ),
+        ("categories.list", "GET", "/api/categories/", lambda r: {"params": {"limit": 100}}),
+        ("categories.get", "GET", "/api/categories/{id}", lambda r: {"id": category_id(r)}),
+        ("inventory.list", "GET", "/api/inventory/", lambda r: {"params": {"limit": 100}}),
+        ("inventory.status", "GET", "/api/inventory/status", lambda r: {}),
+        ("inventory.low_stock", "GET", "/api/inventory/low-stock", lambda r: {}),
+        ("inventory.get", "GET", "/api/inventory/{id}", lambda r: {"id": product_id(r)}),
+        ("inventory.history", "GET", "/api/inventory/history/{id}", lambda r: {"id": product_id(r)}),
+        (
+            "inventory.update", "PUT", "/api/inventory/{id}",
+            lambda r: {
+                "id": product_id(r),
+                "json": {
+                    "inventory_update": {"quantity": r.randint(0, 500)},
+                    "changed_by": "benchmark",
+                    "change_reason": "Benchmark adjustment",
+                },
+            },
+        ),
+        (
+            "inventory.adjustments", "POST", "/api/inventory/adjustments",
+            lambda r: {"json": adjustments(r, 100)},
+        ),
+        ("sales.list", "GET", "/api/sales/", lambda r: {"params": {"limit": 100}}),
+        (
+            "sales.filter", "GET", "/api/sales/filter",
+            lambda r: {"params": {**date_range(r, 30), "category_id": category_id(r), "limit": 100}},
+        ),
+        (
+            "sales.top", "GET", "/api/sales/top",
+            lambda r: {"params": {**date_range(r, 90), "group_by": r.choice(["product", "category", "platform"])}},
+        ),
+        ("sales.export", "GET", "/api/sales/export", lambda r: {"params": date_range(r, 7)}),
+        ("sales.create", "POST", "/api/sales/", lambda r: {"json": new_sale(r)}),
+        (
+            "sales.bulk", "POST", "/api/sales/bulk",
+            lambda r: {"json": [new_sale(r) for _ in range(100)]},
+        ),
+        ("revenue.daily", "GET", "/api/sales/revenue/daily", lambda r: {"params": date_range(r, 90)}),
+        ("revenue.weekly", "GET", "/api/sales/revenue/weekly", lambda r: {"params": date_range(r, 365)}),
+        ("revenue.monthly", "GET", "/api/sales/revenue/monthly", lambda r: {"params": date_range(r, 730)}),
+        ("revenue.yearly", "GET", "/api/sales/revenue/yearly", lambda r: {"params": date_range(r, 1095)}),
+        (
+            "revenue.series", "GET", "/api/sales/revenue/series",
+            lambda r: {"params": {**date_range(r, 365), "granularity": "day,month", "breakdown": "category"}},
+        ),
+        ("revenue.compare", "POST", "/api/sales/revenue/compare", lambda r: {"json": comparison(r)}),
+        (
+            "revenue.compare_periods", "POST", "/api/sales/revenue/compare/periods",
+            lambda r: {"json": {"periods": quarters(r), "breakdown": r.choice([None, "category", "platform"])}},
+        ),
+        (
+            "jobs.submit", "POST", "/api/jobs/",
+            lambda r: {"json": {"kind": "revenue_comparison", "params": {"periods": quarters(r)[:1]}}},
+        ),
+        ("jobs.list", "GET", "/api/jobs/", lambda r: {"params": {"limit": 100}}),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return round(float(np.percentile(sorted_values, fraction * 100)) * 1000, 2)
+
+
+async def run_scenario(client, scenario, total, concurrency, seed):
+    name, method, path, build = scenario
+    rng = random.Random(f"{seed}:{name}")
+    requests = []
+    for _ in range(total):
+        spec = build(rng)
+        requests.append(
+            (path.format(id=spec.get("id")), spec.get("params"), spec.get("json"))
+        )
+
+    latencies = []
+    errors = 0
+    pending = iter(requests)
+
+    async def worker():
+        nonlocal errors
+        for url, params, body in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, params=params, json=body)
+                await response.aread()
+            except httpx.TransportError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "method": method,
+        "path": path,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+async def run_all(base_url, selected, args):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        results = {}
+        for scenario in selected:
+            await run_scenario(client, scenario, args.warmup, args.concurrency, args.seed)
+            results[scenario[0]] = await run_scenario(
+                client, scenario, args.requests, args.concurrency, args.seed
+            )
+            summary = results[scenario[0]]
+            print(
+                f"{scenario[0]:<22} {summary['throughput_rps']:>9} rps  "
+                f"p50 {summary['p50_ms']}ms  p95 {summary['p95_ms']}ms  "
+                f"p99 {summary['p99_ms']}ms  errors {summary['errors']}"
+            )
+        return results
+
+
+def start_server(port):
+    # The job queue is unbounded so jobs.submit measures submission, not 503s
+    env = dict(
+        os.environ, REVENUE_CACHE_BACKEND="none", JOBS_ENABLED="true", JOB_QUEUE_LIMIT="1000000"
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/").status_code == 200:
+                return server, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", help="Comma-separated scenario name prefixes, e.g. revenue,sales.list")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    profile = dataset_profile()
+    selected = scenarios(profile)
+    if args.only:
+        prefixes = tuple(prefix.strip() for prefix in args.only.split(","))
+        selected = [scenario for scenario in selected if scenario[0].startswith(prefixes)]
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = start_server(args.port)
+    try:
+        results = asyncio.run(run_all(base_url, selected, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "dataset": {key: profile[key] for key in ("sales", "products", "categories")},
+        "scenarios": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare the response_model path with the FAST_JSON_RESPONSES path in-process.
+
+    python benchmarks/serialization.py --iterations 50
+
+Each scenario is requested through a TestClient with the fast path off and
+then on (the flag is flipped at runtime), after checking that both produce the
+same JSON. Reports p50/p95 latency per path and the speed-up, so serialization
+cost can be measured without network or server noise.
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+os.environ.setdefault("REVENUE_CACHE_BACKEND", "none")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.main import app
+from app.api import fast_json
+from app.db.database import engine
+
+
+def scenarios():
+    with engine.connect() as connection:
+        max_date = connection.execute(text("SELECT max(sales_date) FROM sales")).scalar()
+    if max_date is None:
+        raise SystemExit("No sales found; load data with benchmarks/datagen.py first")
+    date_range = {"start_date": str(max_date - timedelta(days=365)), "end_date": str(max_date)}
+    return [
+        ("sales.filter", "/api/sales/filter", {**date_range, "limit": 1000}),
+        ("sales.list", "/api/sales/", {"limit": 1000}),
+        ("inventory.status", "/api/inventory/status", {"limit": 1000}),
+        (
+            "inventory.status.ratio", "/api/inventory/status",
+            {"limit": 1000, "sort": "-stock_ratio"},
+        ),
+    ]
+
+
+def measure(client, url, params, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(url, params=params)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 95) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    print(f"{'scenario':<24} {'model p50':>10} {'model p95':>10} {'fast p50':>10} {'fast p95':>10} {'speed-up':>9}")
+    for name, url, params in scenarios():
+        bodies = []
+        results = []
+        for enabled in (False, True):
+            fast_json.FAST_JSON_RESPONSES = enabled
+            bodies.append(client.get(url, params=params).json())
+            measure(client, url, params, args.warmup)
+            results.append(measure(client, url, params, args.iterations))
+        if bodies[0] != bodies[1]:
+            print(f"{name:<24} responses differ between paths")
+            continue
+        (model_p50, model_p95), (fast_p50, fast_p95) = results
+        print(
+            f"{name:<24} {model_p50:>8.1f}ms {model_p95:>8.1f}ms "
+            f"{fast_p50:>8.1f}ms {fast_p95:>8.1f}ms {model_p50 / fast_p50:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
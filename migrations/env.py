@@ -28,6 +28,13 @@ if config.config_file_name is not None:
 from app.models.models import Base
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    # Monthly inventory_history partitions are created at runtime, not modelled
+    if type_ == "table":
+        return not name.startswith("inventory_history_")
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -52,6 +59,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -73,7 +81,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,30 @@
+"""daily revenue covering index
+
+Revision ID: 3e6a0b8d5c17
+Revises: 7c1f9d2a4b60
+Create Date: 2026-10-18 09:12:37.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e6a0b8d5c17'
+down_revision = '7c1f9d2a4b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_daily_revenue_date_product',
+        'daily_revenue',
+        ['sales_date', 'product_id'],
+        unique=False,
+        postgresql_include=['category_id', 'platform', 'revenue', 'units', 'sale_count'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_daily_revenue_date_product', table_name='daily_revenue')
@@ -0,0 +1,36 @@
+"""inventory status indexes
+
+Revision ID: 5b8e2c4f7a31
+Revises: a9d4d6712b2c
+Create Date: 2026-10-17 22:40:12.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2c4f7a31'
+down_revision = 'a9d4d6712b2c'
+branch_labels = None
+depends_on = None
+
+STOCK_RATIO = sa.text(
+    '(CAST(quantity AS FLOAT) / CAST(greatest(low_stock_threshold, 1) AS FLOAT))'
+)
+
+
+def upgrade() -> None:
+    op.create_index('ix_inventory_stock_ratio_id', 'inventory', [STOCK_RATIO, 'id'], unique=False)
+    op.create_index(
+        'ix_inventory_low_stock',
+        'inventory',
+        [STOCK_RATIO, 'id'],
+        unique=False,
+        postgresql_where=sa.text('quantity <= low_stock_threshold'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inventory_low_stock', table_name='inventory')
+    op.drop_index('ix_inventory_stock_ratio_id', table_name='inventory')
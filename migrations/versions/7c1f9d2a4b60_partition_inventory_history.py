@@ -0,0 +1,103 @@
+"""partition inventory history by month
+
+Revision ID: 7c1f9d2a4b60
+Revises: 5b8e2c4f7a31
+Create Date: 2026-10-17 23:15:48.402981
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1f9d2a4b60'
+down_revision = '5b8e2c4f7a31'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'id, product_id, quantity_change, new_quantity, change_reason, change_timestamp, changed_by'
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE inventory_history RENAME TO inventory_history_legacy')
+    op.execute('ALTER INDEX inventory_history_pkey RENAME TO inventory_history_legacy_pkey')
+    op.execute('ALTER INDEX ix_inventory_history_id RENAME TO ix_inventory_history_legacy_id')
+    op.execute('ALTER SEQUENCE inventory_history_id_seq OWNED BY NONE')
+
+    op.execute(
+        """
+        CREATE TABLE inventory_history (
+            id INTEGER NOT NULL DEFAULT nextval('inventory_history_id_seq'),
+            product_id INTEGER NOT NULL REFERENCES products (id),
+            quantity_change INTEGER NOT NULL,
+            new_quantity INTEGER NOT NULL,
+            change_reason VARCHAR(100) NOT NULL,
+            change_timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+            changed_by VARCHAR(100) NOT NULL,
+            CONSTRAINT inventory_history_pkey PRIMARY KEY (id, change_timestamp)
+        ) PARTITION BY RANGE (change_timestamp)
+        """
+    )
+    op.execute('ALTER SEQUENCE inventory_history_id_seq OWNED BY inventory_history.id')
+    op.execute('CREATE TABLE inventory_history_default PARTITION OF inventory_history DEFAULT')
+
+    first = op.get_bind().execute(
+        sa.text('SELECT min(change_timestamp) FROM inventory_history_legacy')
+    ).scalar()
+    this_month = date.today().replace(day=1)
+    month = first.date().replace(day=1) if first is not None else this_month
+    last = _add_months(this_month, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE inventory_history_y{month.year}m{month.month:02d} "
+            f"PARTITION OF inventory_history "
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute(
+        f'INSERT INTO inventory_history ({COLUMNS}) SELECT {COLUMNS} FROM inventory_history_legacy'
+    )
+    op.execute('DROP TABLE inventory_history_legacy')
+
+    op.create_index('ix_inventory_history_id', 'inventory_history', ['id'], unique=False)
+    op.create_index(
+        'ix_inventory_history_product_timestamp',
+        'inventory_history',
+        ['product_id', 'change_timestamp', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE inventory_history RENAME TO inventory_history_partitioned')
+    op.execute('ALTER INDEX inventory_history_pkey RENAME TO inventory_history_partitioned_pkey')
+    op.execute('ALTER INDEX ix_inventory_history_id RENAME TO ix_inventory_history_partitioned_id')
+    op.execute('ALTER SEQUENCE inventory_history_id_seq OWNED BY NONE')
+
+    op.create_table(
+        'inventory_history',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('inventory_history_id_seq')"), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity_change', sa.Integer(), nullable=False),
+        sa.Column('new_quantity', sa.Integer(), nullable=False),
+        sa.Column('change_reason', sa.String(length=100), nullable=False),
+        sa.Column('change_timestamp', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('changed_by', sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute('ALTER SEQUENCE inventory_history_id_seq OWNED BY inventory_history.id')
+    op.execute(
+        f'INSERT INTO inventory_history ({COLUMNS}) SELECT {COLUMNS} FROM inventory_history_partitioned'
+    )
+    op.execute('DROP TABLE inventory_history_partitioned CASCADE')
+    op.create_index(op.f('ix_inventory_history_id'), 'inventory_history', ['id'], unique=False)
@@ -0,0 +1,47 @@
+"""product search
+
+Revision ID: 8f2d4a61c9e3
+Revises: 3e6a0b8d5c17
+Create Date: 2026-10-18 14:41:06.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2d4a61c9e3'
+down_revision = '3e6a0b8d5c17'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', sku), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column(
+        'products',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)),
+    )
+    op.create_index('ix_products_search_vector', 'products', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_products_name_trgm', 'products', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_products_sku_trgm', 'products', ['sku'], unique=False,
+        postgresql_using='gin', postgresql_ops={'sku': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_sku_trgm', table_name='products')
+    op.drop_index('ix_products_name_trgm', table_name='products')
+    op.drop_index('ix_products_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
@@ -0,0 +1,24 @@
+"""sales keyset index
+
+Revision ID: a9d4d6712b2c
+Revises: f11e28fdbaab
+Create Date: 2026-10-17 11:02:37.845120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4d6712b2c'
+down_revision = 'f11e28fdbaab'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sales_sales_date_id', 'sales', ['sales_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_sales_date_id', table_name='sales')
@@ -0,0 +1,56 @@
+"""table versions
+
+Revision ID: c4b7e91a2d05
+Revises: 8f2d4a61c9e3
+Create Date: 2026-10-18 17:03:52.861407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4b7e91a2d05'
+down_revision = '8f2d4a61c9e3'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('categories', 'products', 'inventory')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=63), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    op.execute('CREATE SEQUENCE table_versions_seq')
+    op.execute(
+        """
+        CREATE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, version)
+            VALUES (TG_TABLE_NAME, nextval('table_versions_seq'))
+            ON CONFLICT (table_name) DO UPDATE SET version = excluded.version;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in VERSIONED_TABLES:
+        op.execute(
+            f"INSERT INTO table_versions (table_name, version) VALUES ('{table}', nextval('table_versions_seq'))"
+        )
+        op.execute(
+            f'CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()'
+        )
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.execute(f'DROP TRIGGER {table}_version ON {table}')
+    op.execute('DROP FUNCTION bump_table_version()')
+    op.execute('DROP SEQUENCE table_versions_seq')
+    op.drop_table('table_versions')
@@ -0,0 +1,111 @@
+"""initial schema
+
+Revision ID: d3d65e0d0aad
+Revises:
+Create Date: 2026-10-17 09:12:41.503812
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3d65e0d0aad'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases bootstrapped by scripts/load_demo_data.py already have these
+    # tables, so only create the ones that are missing.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'categories' not in existing:
+        op.create_table(
+            'categories',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_categories_id'), 'categories', ['id'], unique=False)
+
+    if 'products' not in existing:
+        op.create_table(
+            'products',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('price', sa.DECIMAL(precision=10, scale=2), nullable=False),
+            sa.Column('category_id', sa.Integer(), nullable=True),
+            sa.Column('sku', sa.String(length=50), nullable=False),
+            sa.Column('image_url', sa.String(length=255), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_products_id'), 'products', ['id'], unique=False)
+        op.create_index(op.f('ix_products_sku'), 'products', ['sku'], unique=True)
+
+    if 'inventory' not in existing:
+        op.create_table(
+            'inventory',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('low_stock_threshold', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_inventory_id'), 'inventory', ['id'], unique=False)
+        op.create_index(op.f('ix_inventory_product_id'), 'inventory', ['product_id'], unique=False)
+
+    if 'inventory_history' not in existing:
+        op.create_table(
+            'inventory_history',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('quantity_change', sa.Integer(), nullable=False),
+            sa.Column('new_quantity', sa.Integer(), nullable=False),
+            sa.Column('change_reason', sa.String(length=100), nullable=False),
+            sa.Column('change_timestamp', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.Column('changed_by', sa.String(length=100), nullable=False),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_inventory_history_id'), 'inventory_history', ['id'], unique=False)
+
+    if 'sales' not in existing:
+        op.create_table(
+            'sales',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('order_id', sa.String(length=50), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('unit_price', sa.DECIMAL(precision=10, scale=2), nullable=False),
+            sa.Column('total_price', sa.DECIMAL(precision=10, scale=2), nullable=False),
+            sa.Column('customer_id', sa.String(length=100), nullable=True),
+            sa.Column('sales_date', sa.Date(), nullable=False),
+            sa.Column('platform', sa.String(length=50), nullable=True),
+            sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_sales_id'), 'sales', ['id'], unique=False)
+        op.create_index(op.f('ix_sales_product_id'), 'sales', ['product_id'], unique=False)
+        op.create_index(op.f('ix_sales_sales_date'), 'sales', ['sales_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('sales')
+    op.drop_table('inventory_history')
+    op.drop_table('inventory')
+    op.drop_table('products')
+    op.drop_table('categories')
@@ -0,0 +1,45 @@
+"""jobs
+
+Revision ID: e9a3f5c27b14
+Revises: c4b7e91a2d05
+Create Date: 2026-10-18 20:26:11.370942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a3f5c27b14'
+down_revision = 'c4b7e91a2d05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('progress', sa.Float(), nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('result_path', sa.String(length=500), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=False)
+    op.create_index('ix_jobs_status_id', 'jobs', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_status_id', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
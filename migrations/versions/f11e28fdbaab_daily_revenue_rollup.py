@@ -0,0 +1,62 @@
+"""daily revenue rollup
+
+Revision ID: f11e28fdbaab
+Revises: d3d65e0d0aad
+Create Date: 2026-10-17 09:40:03.117204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f11e28fdbaab'
+down_revision = 'd3d65e0d0aad'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_revenue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sales_date', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('platform', sa.String(length=50), nullable=True),
+        sa.Column('revenue', sa.DECIMAL(precision=14, scale=2), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('sale_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_daily_revenue_id'), 'daily_revenue', ['id'], unique=False)
+    op.create_index(op.f('ix_daily_revenue_product_id'), 'daily_revenue', ['product_id'], unique=False)
+    op.create_index(op.f('ix_daily_revenue_category_id'), 'daily_revenue', ['category_id'], unique=False)
+    op.create_index(
+        'uq_daily_revenue_key',
+        'daily_revenue',
+        ['sales_date', 'product_id', sa.text("coalesce(platform, '')")],
+        unique=True,
+    )
+
+    # Backfill from existing sales
+    op.execute(
+        """
+        INSERT INTO daily_revenue
+            (sales_date, product_id, category_id, platform, revenue, units, sale_count)
+        SELECT s.sales_date, s.product_id, p.category_id, s.platform,
+               SUM(s.total_price), SUM(s.quantity), COUNT(s.id)
+        FROM sales s
+        JOIN products p ON p.id = s.product_id
+        GROUP BY s.sales_date, s.product_id, p.category_id, s.platform
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_daily_revenue_key', table_name='daily_revenue')
+    op.drop_index(op.f('ix_daily_revenue_category_id'), table_name='daily_revenue')
+    op.drop_index(op.f('ix_daily_revenue_product_id'), table_name='daily_revenue')
+    op.drop_index(op.f('ix_daily_revenue_id'), table_name='daily_revenue')
+    op.drop_table('daily_revenue')
@@ -1,6 +1,21 @@
+"""
+Load demo data.
+
+Without arguments a small curated catalog with 1,000 random sales is loaded
+through the ORM. With --scale a staging-sized dataset is generated instead:
+columns are built with vectorized NumPy, sales are split into chunks that a
+process pool generates and COPYs into Postgres in parallel, and the revenue
+rollup is rebuilt at the end. Product popularity follows a power law and
+sales volume has a yearly seasonal swing plus optional growth.
+
+    python scripts/load_demo_data.py --scale --reset --sales 10000000 --products 100000 --years 3 --workers 8
+"""
 import os
 import sys
 import csv
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta, date
 import random
 from decimal import Decimal
@@ -9,9 +24,13 @@ import numpy as np
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal, engine, Base
+from app.db.datagen import TABLES, copy_frame, day_weights, popularity, reset_sequences, sales_frame
 from app.models.models import Category, Product, Inventory, InventoryHistory, Sale
+from app.services.history_partitions import ensure_partitions
+from app.services.revenue_rollup import apply_sales, rebuild_daily_revenue
 
 Base.metadata.create_all(bind=engine)
 
@@ -91,6 +110,7 @@ def generate_sales_data(db: Session, start_date: date, end_date: date, num_sales
         sales.append(sale)
     
     db.add_all(sales)
+    apply_sales(db, sales, {product.id: product.category_id for product in products})
     db.commit()
     print(f"Generated {num_sales} sales records")
 
@@ -154,7 +174,260 @@ def load_demo_data():
     finally:
         db.close()
 
+# Scalable mode
+
+HISTORY_REASONS = np.array(["Sales adjustment", "Restock"])
+
+
+def catalog_frames(rng, categories, products):
+    """Categories and products named after the curated demo catalog."""
+    category_ids = np.arange(1, categories + 1)
+    category_frame = pd.DataFrame(
+        {
+            "id": category_ids,
+            "name": [f"{CATEGORIES[i % len(CATEGORIES)]['name']} {i // len(CATEGORIES) + 1}" for i in range(categories)],
+            "description": [CATEGORIES[i % len(CATEGORIES)]["description"] for i in range(categories)],
+        }
+    )
+    ids = np.arange(1, products + 1)
+    templates = [PRODUCTS[i % len(PRODUCTS)] for i in range(products)]
+    base_prices = np.array([template["price"] for template in templates])
+    product_frame = pd.DataFrame(
+        {
+            "id": ids,
+            "name": [f"{template['name']} {i}" for template, i in zip(templates, ids)],
+            "description": [template["description"] for template in templates],
+            "price": np.round(np.clip(base_prices * rng.lognormal(0, 0.3, products), 0.99, None), 2),
+            "category_id": rng.integers(1, categories + 1, products),
+            "sku": [f"{template['sku'][:-4]}-{i:07d}" for template, i in zip(templates, ids)],
+            "image_url": [template["image_url"] for template in templates],
+            "is_active": np.where(rng.random(products) < 0.97, "t", "f"),
+        }
+    )
+    return category_frame, product_frame
+
+
+def inventory_frames(rng, product_ids, events, start_date, end_date):
+    """
+    Current inventory plus `events` history rows per product. Stock levels are
+    drawn first and changes derived from them, so each product's history adds
+    up to its current quantity.
+    """
+    count = len(product_ids)
+    levels = rng.integers(0, 500, (count, events))
+    changes = np.diff(levels, axis=1, prepend=0)
+    span = (end_date - start_date).days * 86400
+    offsets = np.sort(rng.integers(0, max(span, 1), (count, events)), axis=1)
+    offsets[:, 0] = 0
+    reasons = HISTORY_REASONS[(changes > 0).astype(int)]
+    reasons[:, 0] = "Initial stock"
+
+    inventory = pd.DataFrame(
+        {
+            "id": product_ids,
+            "product_id": product_ids,
+            "quantity": levels[:, -1],
+            "low_stock_threshold": rng.integers(5, 50, count),
+        }
+    )
+    history = pd.DataFrame(
+        {
+            "id": np.arange(1, count * events + 1),
+            "product_id": np.repeat(product_ids, events),
+            "quantity_change": changes.ravel(),
+            "new_quantity": levels.ravel(),
+            "change_reason": reasons.ravel(),
+            "change_timestamp": (np.datetime64(start_date, "s") + offsets.ravel()).astype(str),
+            "changed_by": "System",
+        }
+    )
+    return inventory, history
+
+
+# Per-process generation inputs, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(prices, product_weights, date_weights, start_date, customers):
+    # Connections inherited from the parent must not be shared with it
+    engine.dispose(close=False)
+    _worker.update(
+        prices=prices,
+        product_cdf=np.cumsum(product_weights),
+        date_cdf=np.cumsum(date_weights),
+        start_date=start_date,
+        customers=customers,
+    )
+
+
+def _load_sales_chunk(first_id, size, seed):
+    """Generate one chunk of sales and COPY it on this worker's own connection."""
+    frame = sales_frame(np.random.default_rng(seed), first_id, size, **_worker)
+    connection = engine.raw_connection()
+    try:
+        copy_frame(connection.cursor(), "sales", frame)
+        connection.commit()
+    finally:
+        connection.close()
+    return size
+
+
+def drop_secondary_indexes(cursor, table):
+    """
+    Drop the foreign keys and non-unique indexes of `table` and return the DDL
+    that restores them. Building them once after a bulk load is much cheaper
+    than maintaining them row by row during COPY.
+    """
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        (table,),
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = %s::regclass AND NOT indisunique",
+        (table,),
+    )
+    indexes = cursor.fetchall()
+    for name, _ in foreign_keys:
+        cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {name}")
+    return [definition for _, definition in indexes] + [
+        f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}" for name, definition in foreign_keys
+    ]
+
+
+def load_scaled_data(args):
+    """Generate and bulk-load a dataset sized by `args`."""
+    seeds = np.random.SeedSequence(args.seed)
+    catalog_seed, *chunk_seeds = seeds.spawn(1 + -(-args.sales // args.chunk_size))
+    rng = np.random.default_rng(catalog_seed)
+    end_date = date.today()
+    start_date = end_date - timedelta(days=int(365 * args.years))
+    started = time.perf_counter()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if args.reset:
+            cursor.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        else:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM categories)")
+            if cursor.fetchone()[0]:
+                raise SystemExit("Database already contains data; rerun with --reset to replace it")
+
+        categories, products = catalog_frames(rng, args.categories, args.products)
+        copy_frame(cursor, "categories", categories)
+        copy_frame(cursor, "products", products)
+        inventory, history = inventory_frames(
+            rng, products["id"].to_numpy(), args.history_events, start_date, end_date
+        )
+        copy_frame(cursor, "inventory", inventory)
+        connection.commit()
+    finally:
+        connection.close()
+
+    db = SessionLocal()
+    try:
+        # History rows land in their monthly partitions rather than the default one
+        ensure_partitions(db, start=start_date)
+        db.commit()
+    finally:
+        db.close()
+
+    connection = engine.raw_connection()
+    try:
+        copy_frame(connection.cursor(), "inventory_history", history)
+        connection.commit()
+    finally:
+        connection.close()
+    print(
+        f"Loaded {args.categories} categories, {args.products} products "
+        f"and {len(history)} inventory history rows"
+    )
+
+    prices = products["price"].to_numpy()
+    product_weights = popularity(rng, args.products, args.skew)
+    date_weights = day_weights(
+        start_date, (end_date - start_date).days + 1, args.seasonality, args.growth
+    )
+    chunks = [
+        (first_id, min(args.chunk_size, args.sales - first_id + 1), seed)
+        for first_id, seed in zip(range(1, args.sales + 1, args.chunk_size), chunk_seeds)
+    ]
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        restore = drop_secondary_indexes(cursor, "sales")
+        connection.commit()
+        loaded = 0
+        try:
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                initializer=_init_worker,
+                initargs=(prices, product_weights, date_weights, start_date, args.customers),
+            ) as pool:
+                futures = [pool.submit(_load_sales_chunk, *chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    loaded += future.result()
+                    rate = loaded / (time.perf_counter() - started)
+                    print(f"  sales: {loaded}/{args.sales} ({rate:,.0f} rows/s)")
+        finally:
+            print("Rebuilding sales indexes and foreign keys")
+            cursor.execute("SET maintenance_work_mem = '512MB'")
+            for statement in restore:
+                cursor.execute(statement)
+            connection.commit()
+
+        reset_sequences(cursor)
+        connection.commit()
+    finally:
+        connection.close()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_daily_revenue(db)
+        db.commit()
+        print(f"Rebuilt daily_revenue ({rows} rows)")
+    finally:
+        db.close()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", action="store_true", help="Generate a large dataset with NumPy and COPY")
+    parser.add_argument("--reset", action="store_true", help="Truncate application tables first (--scale only)")
+    parser.add_argument("--sales", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--customers", type=int, default=500_000)
+    parser.add_argument("--years", type=float, default=2, help="Date span of sales and history, ending today")
+    parser.add_argument("--history-events", type=int, default=5, help="Inventory history rows per product")
+    parser.add_argument("--skew", type=float, default=1.1, help="Power-law exponent of product popularity")
+    parser.add_argument("--seasonality", type=float, default=0.6, help="Amplitude of the yearly sales cycle (0 to 1)")
+    parser.add_argument("--growth", type=float, default=0.0, help="Yearly growth of sales volume, e.g. 0.2")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=250_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.scale:
+        print("Loading demo data...")
+        load_demo_data()
+        print("Demo data load complete!")
+        return
+    if not 0 <= args.seasonality <= 1:
+        parser.error("--seasonality must be between 0 and 1")
+    if args.history_events < 1:
+        parser.error("--history-events must be at least 1")
+    load_scaled_data(args)
+
+
 if __name__ == "__main__":
-    print("Loading demo data...")
-    load_demo_data()
-    print("Demo data load complete!") 
\ No newline at end of file
+    main()
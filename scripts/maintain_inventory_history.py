@@ -0,0 +1,56 @@
+import os
+import sys
+import argparse
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal
+from app.services.history_partitions import (
+    add_months,
+    compact_history,
+    ensure_partitions,
+    month_start,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Create upcoming inventory_history partitions and compact old months"
+    )
+    parser.add_argument(
+        "--months-ahead", type=int, default=3,
+        help="Create partitions up to this many months after the current one",
+    )
+    parser.add_argument(
+        "--start-date", type=date.fromisoformat, default=None,
+        help="Also create partitions back to this month (default: current month)",
+    )
+    parser.add_argument(
+        "--compact-after-months", type=int, default=None,
+        help="Collapse months that ended this many months ago into daily net changes",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for name in ensure_partitions(db, args.months_ahead, args.start_date):
+            print(f"Created partition {name}")
+        db.commit()
+
+        if args.compact_after_months is not None:
+            cutoff = add_months(month_start(date.today()), -args.compact_after_months)
+            for name, before, after in compact_history(db, cutoff):
+                if after < before:
+                    print(f"Compacted {name}: {before} -> {after} rows")
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error maintaining inventory_history: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import argparse
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal
+from app.services.revenue_rollup import rebuild_daily_revenue
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the daily_revenue rollup from the sales table"
+    )
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_daily_revenue(db, args.start_date, args.end_date)
+        db.commit()
+        print(f"Rebuilt daily_revenue with {rows} rows")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding daily_revenue: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import pytest
+
+from app.api.pagination import encode_cursor
+from app.services import inventory_adjustments
+
+
+@pytest.fixture
+def backorder(monkeypatch):
+    monkeypatch.setattr(inventory_adjustments, "SALES_DECREMENT_STOCK", "backorder")
+
+
+def record_sale(client, product_id, quantity):
+    response = client.post(
+        "/api/sales/",
+        json={
+            "order_id": f"TEST-{product_id}-{quantity}",
+            "product_id": product_id,
+            "quantity": quantity,
+            "unit_price": "10.00",
+            "total_price": f"{10 * quantity}.00",
+            "sales_date": "2001-01-01",
+            "platform": "Amazon",
+        },
+    )
+    assert response.status_code == 201, response.text
+
+
+def test_backordered_product_reads_back(client, product_id, backorder):
+    record_sale(client, product_id, 3)
+
+    response = client.get(f"/api/inventory/{product_id}")
+    assert response.status_code == 200, response.text
+    assert response.json()["quantity"] == -3
+
+    inventory_id = response.json()["id"]
+    response = client.get(
+        "/api/inventory/",
+        params={"cursor": encode_cursor(inventory_id - 1), "limit": 1, "fields": "id,quantity"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [{"id": inventory_id, "quantity": -3}]
+
+    response = client.put(
+        f"/api/inventory/{product_id}",
+        json={
+            "inventory_update": {"low_stock_threshold": 5},
+            "changed_by": "test",
+            "change_reason": "Threshold",
+        },
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["quantity"] == -3
+
+
+def test_partial_restock_after_backorder(client, product_id, backorder):
+    record_sale(client, product_id, 50)
+
+    def adjust(delta):
+        return client.post(
+            "/api/inventory/adjustments",
+            json={
+                "adjustments": [{"product_id": product_id, "delta": delta}],
+                "changed_by": "test",
+                "change_reason": "Restock",
+            },
+        )
+
+    response = adjust(20)
+    assert response.status_code == 200, response.text
+    assert response.json()["results"][0]["new_quantity"] == -30
+
+    # Lowering stock that is already negative is still refused
+    assert adjust(-1).status_code == 409
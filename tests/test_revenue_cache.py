@@ -0,0 +1,39 @@
+from datetime import date
+
+from app.cache.base import InMemoryCache
+
+JANUARY = [(date(2024, 1, 1), date(2024, 1, 31))]
+FEBRUARY = [(date(2024, 2, 1), date(2024, 2, 29))]
+
+
+def compute(value):
+    return lambda: value
+
+
+def test_primary_results_are_stored_after_an_invalidation():
+    cache = InMemoryCache()
+    cache.invalidate_date(date(2024, 1, 5))
+    cache.get_or_compute("daily", {"month": 1}, JANUARY, compute(1))
+    assert cache.get_or_compute("daily", {"month": 1}, JANUARY, compute(2)) == 1
+
+
+def test_replica_results_are_not_stored_right_after_an_invalidation():
+    cache = InMemoryCache()
+    cache.invalidate_date(date(2024, 1, 5))
+    cache.get_or_compute("daily", {"month": 1}, JANUARY, compute(1), staleness=15)
+    assert cache.get_or_compute("daily", {"month": 1}, JANUARY, compute(2), staleness=15) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_replica_results_are_stored_for_untouched_ranges():
+    cache = InMemoryCache()
+    cache.invalidate_date(date(2024, 1, 5))
+    cache.get_or_compute("daily", {"month": 2}, FEBRUARY, compute(1), staleness=15)
+    assert cache.get_or_compute("daily", {"month": 2}, FEBRUARY, compute(2), staleness=15) == 1
+
+
+def test_replica_results_are_not_stored_right_after_a_clear():
+    cache = InMemoryCache()
+    cache.clear()
+    cache.get_or_compute("daily", {"month": 2}, FEBRUARY, compute(1), staleness=15)
+    assert cache.stats()["entries"] == 0